@@ -0,0 +1,113 @@
+import argparse
+
+import numpy as np
+
+from core.level import Level
+from core.level_file import save_level_file
+from core.level_geometry import BLOCK_WIDTH
+
+LAYOUTS = ("flat", "platforms", "hills")
+
+# Platform steps stay well inside what the player can jump
+MAX_STEP_UP = 3
+MAX_STEP_DOWN = 4
+MAX_GAP = 4
+HILL_DEPTH = 4
+
+
+def flat_cells(block_count: int, rng: np.random.Generator) -> np.ndarray:
+    """One long floor"""
+    xs = np.arange(block_count)
+    return np.stack((xs, np.zeros_like(xs)), axis=1)
+
+
+def platform_cells(block_count: int, rng: np.random.Generator) -> np.ndarray:
+    """Floating platforms with gaps and small height changes between them"""
+    cells = []
+    x, y = 0, 0
+    while len(cells) < block_count:
+        length = min(int(rng.integers(3, 12)), block_count - len(cells))
+        cells.extend((x + i, y) for i in range(length))
+        x += length + int(rng.integers(1, MAX_GAP + 1))
+        y += int(rng.integers(-MAX_STEP_DOWN, MAX_STEP_UP + 1))
+    return np.array(cells)
+
+
+def hill_cells(block_count: int, rng: np.random.Generator) -> np.ndarray:
+    """Solid ground a few cells deep whose surface walks up and down"""
+    cells = []
+    x, y = 0, 0
+    while len(cells) < block_count:
+        depth = min(HILL_DEPTH, block_count - len(cells))
+        cells.extend((x, y - i) for i in range(depth))
+        x += 1
+        y += int(rng.choice([-1, 0, 0, 0, 1]))
+    return np.array(cells)
+
+
+CELL_GENERATORS = {
+    "flat": flat_cells,
+    "platforms": platform_cells,
+    "hills": hill_cells,
+}
+
+
+def surface_cells(cells: np.ndarray) -> np.ndarray:
+    """Cells with nothing on top of them, sorted left to right"""
+    occupied = set(map(tuple, cells.tolist()))
+    top = np.array([(x, y + 1) not in occupied for x, y in cells.tolist()])
+    surface = cells[top]
+    return surface[np.lexsort((surface[:, 1], surface[:, 0]))]
+
+
+def generate_level(
+    block_count: int,
+    layout: str = "platforms",
+    enemy_density: float = 0.05,
+    ammo_count: int = 10,
+    seed: int = 0,
+) -> Level:
+    """Synthetic level with about `block_count` blocks.
+
+    Enemies stand on `enemy_density` of the surface cells, ammo floats
+    above random surface cells, the player spawns on the left end and the
+    portal sits on the right end.
+    """
+    if layout not in CELL_GENERATORS:
+        raise ValueError(f"unknown layout {layout!r}, expected one of {LAYOUTS}")
+
+    rng = np.random.default_rng(seed)
+    cells = CELL_GENERATORS[layout](max(block_count, 2), rng)
+    surface = surface_cells(cells)
+    # Keep the spawn and the portal free of enemies and ammo
+    inner = surface[1:-1]
+
+    enemy_count = min(int(round(len(inner) * enemy_density)), len(inner))
+    enemy_cells = inner[rng.choice(len(inner), enemy_count, replace=False)]
+    ammo_cells = inner[rng.choice(len(inner), min(ammo_count, len(inner)))]
+
+    level = Level()
+    level.blocks = [(int(x), int(y)) for x, y in cells * BLOCK_WIDTH]
+    level.enemies = [(int(x), int(y)) for x, y in (enemy_cells + (0, 1)) * BLOCK_WIDTH]
+    level.ammo = [(int(x), int(y)) for x, y in (ammo_cells + (0, 2)) * BLOCK_WIDTH]
+    level.player_spawn = tuple(int(v) for v in (surface[0] + (0, 1)) * BLOCK_WIDTH)
+    level.level_end = tuple(int(v) for v in (surface[-1] + (0, 1)) * BLOCK_WIDTH)
+    return level
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic level file")
+    parser.add_argument("target", help="level to write (.json or .lvl)")
+    parser.add_argument("--blocks", type=int, default=1000)
+    parser.add_argument("--layout", choices=LAYOUTS, default="platforms")
+    parser.add_argument("--enemy-density", type=float, default=0.05)
+    parser.add_argument("--ammo", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    save_level_file(
+        generate_level(
+            args.blocks, args.layout, args.enemy_density, args.ammo, args.seed
+        ),
+        args.target,
+    )
@@ -0,0 +1,166 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from core.simulation import Simulation, hold  # sets up headless pyglet first
+from benchmarks.level_generator import LAYOUTS, generate_level
+from core.level_file import load_level_file, save_level_file
+from core.level_loader import level_data
+from core.profiler import PROFILER
+from pyglet.window import key
+
+DEFAULT_TICKS = 1200
+DEFAULT_BLOCKS = (1000, 10000, 50000)
+
+# Run right, jump and shoot the whole time so movement, collisions,
+# bullets and enemy chasing are all exercised
+BENCHMARK_INPUT = hold(key.D, key.W, key.F)
+
+
+def load(path: str) -> tuple[Simulation, float, float]:
+    """Simulation for the level file with read and build times in seconds"""
+    start = time.perf_counter()
+    level = load_level_file(path)
+    data = level_data(os.path.basename(path), level)
+    read = time.perf_counter()
+    simulation = Simulation(data.name, data)
+    built = time.perf_counter()
+
+    # Keep the player alive so every run covers the same number of ticks
+    simulation.level_context.player.health = float("inf")
+    return simulation, read - start, built - read
+
+
+def run_ticks(simulation: Simulation, ticks: int, profile: bool = False) -> int:
+    ran = 0
+    while ran < ticks and simulation.running:
+        simulation.step(BENCHMARK_INPUT(ran))
+        ran += 1
+        if profile:
+            PROFILER.end_frame()
+    return ran
+
+
+def measure_peak_memory(path: str, ticks: int) -> int:
+    """Peak traced allocation of loading and running, done in its own pass
+    since tracing slows everything down"""
+    tracemalloc.start()
+    try:
+        simulation, _, _ = load(path)
+        run_ticks(simulation, ticks)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(
+    directory: str,
+    layout: str,
+    block_count: int,
+    enemy_density: float,
+    ammo_count: int,
+    ticks: int,
+    seed: int,
+    file_format: str,
+    memory: bool,
+) -> dict:
+    level = generate_level(block_count, layout, enemy_density, ammo_count, seed)
+    path = os.path.join(directory, f"{layout}_{block_count}{file_format}")
+    save_level_file(level, path)
+
+    simulation, read_seconds, build_seconds = load(path)
+
+    PROFILER.start(history=ticks)
+    start = time.perf_counter()
+    ran = run_ticks(simulation, ticks, profile=True)
+    elapsed = time.perf_counter() - start
+    PROFILER.stop()
+
+    return {
+        "layout": layout,
+        "blocks": len(level.blocks),
+        "enemies": len(level.enemies),
+        "ammo": len(level.ammo),
+        "format": file_format,
+        "seed": seed,
+        "ticks": ran,
+        "outcome": simulation.outcome,
+        "seconds": elapsed,
+        "ticks_per_second": ran / elapsed if elapsed > 0 else None,
+        "load_seconds": read_seconds + build_seconds,
+        "read_seconds": read_seconds,
+        "build_seconds": build_seconds,
+        "phases_ms": {
+            name: average * 1000 for name, (average, _) in PROFILER.averages().items()
+        },
+        "peak_memory_bytes": measure_peak_memory(path, ticks) if memory else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run synthetic levels headless and report timings as JSON"
+    )
+    parser.add_argument("--layout", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    parser.add_argument("--blocks", nargs="+", type=int, default=DEFAULT_BLOCKS)
+    parser.add_argument("--enemy-density", type=float, default=0.05)
+    parser.add_argument("--ammo", type=int, default=20)
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=(".json", ".lvl"), default=".json")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc pass"
+    )
+    parser.add_argument("--out", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            run_case(
+                directory,
+                layout,
+                block_count,
+                args.enemy_density,
+                args.ammo,
+                args.ticks,
+                args.seed,
+                args.format,
+                not args.no_memory,
+            )
+            for layout, block_count in itertools.product(args.layout, args.blocks)
+        ]
+
+    report = {
+        "revision": git_revision(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.out is None:
+        print(json.dumps(report, indent=4))
+    else:
+        with open(args.out, "w") as out:
+            json.dump(report, out, indent=4)
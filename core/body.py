@@ -3,11 +3,37 @@ import numpy as np
 from pyglet import shapes
 
 
+def boxes_colliding(boxes: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """(N, M) mask of touching pairs, rows of both arrays are x, y, w, h"""
+    a = boxes[:, np.newaxis, :]
+    b = others[np.newaxis, :, :]
+    return (
+        (a[..., 0] <= b[..., 0] + b[..., 2])
+        & (a[..., 0] + a[..., 2] >= b[..., 0])
+        & (a[..., 1] <= b[..., 1] + b[..., 3])
+        & (a[..., 1] + a[..., 3] >= b[..., 1])
+    )
+
+
+def boxes_of(bodies: list["Body"]) -> np.ndarray:
+    if len(bodies) == 0:
+        return np.empty((0, 4))
+    return np.array([body.box for body in bodies], dtype=float)
+
+
 class Body(ABC):
     def __init__(self, x, y, width, height) -> None:
         self.pos = np.array([x, y])
         self.hitbox = np.array([width, height])
-        self.center = self.pos + self.hitbox / 2
+        self.half_hitbox = self.hitbox / 2
+        self.center = self.pos + self.half_hitbox
+
+    def update_center(self) -> None:
+        np.add(self.pos, self.half_hitbox, out=self.center)
+
+    @property
+    def box(self) -> np.array:
+        return np.concatenate((self.pos, self.hitbox))
 
     def is_colliding(self, body: "Body", offset: np.array = np.array([0, 0])) -> bool:
         return (
@@ -38,6 +64,22 @@ class Body(ABC):
             and self.pos[1] + self.hitbox[1] * 3 / 4 > body.pos[1]
         )
 
+    def colliding_mask_into(
+        self, boxes: np.ndarray, ends: np.ndarray, out: np.ndarray, scratch: np.ndarray
+    ) -> np.ndarray:
+        """Batch `is_colliding` against an (N, 4) array of boxes, written into
+        `out` without allocating arrays. `ends` holds the right and top edges
+        of the boxes and `scratch` is a buffer as long as `out`."""
+        x, y = self.pos
+        np.less_equal(x, ends[:, 0], out=out)
+        np.greater_equal(x + self.hitbox[0], boxes[:, 0], out=scratch)
+        out &= scratch
+        np.less_equal(y, ends[:, 1], out=scratch)
+        out &= scratch
+        np.greater_equal(y + self.hitbox[1], boxes[:, 1], out=scratch)
+        out &= scratch
+        return out
+
     def wall_colliding(self, body: "Body", x_offset: int = 0) -> bool:
         return
 
@@ -10,4 +10,14 @@ class Direction(Enum):
     RIGHT = (1, 0)
 
     def get(self) -> np.array:
-        return np.array(self.value)
+        """Shared read-only array of the direction, never copy it per frame"""
+        return DIRECTION_ARRAYS[self]
+
+
+def _read_only(value) -> np.array:
+    array = np.array(value)
+    array.flags.writeable = False
+    return array
+
+
+DIRECTION_ARRAYS = {direction: _read_only(direction.value) for direction in Direction}
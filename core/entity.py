@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
+from functools import cache
 import numpy as np
 from pyglet import shapes, sprite, resource, image
+from pyglet.graphics import Group
 from core.body import Body
 from core.direction import Direction
 from objects.block import Block
@@ -20,7 +22,7 @@ class EntityMode(Enum):
     JUMPING = "jumping"
 
 
-@dataclass
+@dataclass(frozen=True)
 class SpriteConfig:
     mode: EntityMode
     is_animation: bool
@@ -30,20 +32,48 @@ class SpriteConfig:
     rows: int | None
 
 
+@cache
+def load_sprite_image(
+    sprite_folder_url: str, sprite_config: SpriteConfig
+) -> image.AbstractImage | image.Animation:
+    """Texture or animation for one sprite mode, shared by every entity"""
+    sprite_sheet = resource.image(sprite_folder_url + sprite_config.mode.value + ".png")
+
+    if not sprite_config.is_animation:
+        return sprite_sheet
+
+    image_grid = image.ImageGrid(
+        sprite_sheet,
+        rows=sprite_config.rows,
+        columns=sprite_config.columns,
+        column_padding=sprite_config.column_padding,
+    )
+
+    return image.Animation.from_image_sequence(
+        image_grid, duration=sprite_config.duration, loop=True
+    )
+
+
 class Entity(Body, ABC):
+    render_group: Group = None
 
     def __init__(self, x, y, width, height, level_context, health: float):
         super().__init__(x, y, width, height)
+        self.prev_pos = self.pos.copy()
         self.vel = np.array([0, 0])
+        self.acc = np.zeros_like(GRAVITY)
         self.speed = 10
         self.direction: np.array = Direction.RIGHT.get()
-        self.mode_sprite_map: dict[EntityMode : sprite.Sprite] = {
+        self.mode_image_map: dict[EntityMode : image.AbstractImage] = {
             EntityMode.IDLE: None,
             EntityMode.WALKING: None,
             EntityMode.ATTACKING: None,
             EntityMode.DYING: None,
             EntityMode.JUMPING: None,
         }
+        self.sprite: sprite.Sprite = None
+        self.sprite_mode: EntityMode = None
+        self.fallback_rect: shapes.Rectangle = None
         self.current_mode = EntityMode.IDLE
         self.color = (255, 255, 255)
         self.level_context = level_context
@@ -59,58 +89,105 @@ class Entity(Body, ABC):
         sprite_folder_url: str,
         sprite_configs: list[SpriteConfig],
     ):
+        if self.level_context.headless:
+            return
+
         for sprite_config in sprite_configs:
-            if sprite_config.is_animation:
-                sprite_sheet = resource.image(
-                    sprite_folder_url + sprite_config.mode.value + ".png"
-                )
-                image_grid = image.ImageGrid(
-                    sprite_sheet,
-                    rows=sprite_config.rows,
-                    columns=sprite_config.columns,
-                    column_padding=sprite_config.column_padding,
-                )
+            self.mode_image_map[sprite_config.mode] = load_sprite_image(
+                sprite_folder_url, sprite_config
+            )
 
-                ani = image.Animation.from_image_sequence(
-                    image_grid, duration=sprite_config.duration, loop=True
-                )
+        self.sprite_mode = (
+            self.current_mode
+            if self.mode_image_map[self.current_mode] is not None
+            else sprite_configs[0].mode
+        )
+        self.sprite = sprite.Sprite(
+            img=self.mode_image_map[self.sprite_mode],
+            x=self.pos[0],
+            y=self.pos[1],
+            batch=self.level_context.world_batch,
+            group=self.render_group,
+        )
+        # Hidden until `LevelContext.show` finds the entity in view
+        self.sprite.visible = False
 
-                self.mode_sprite_map[sprite_config.mode] = sprite.Sprite(
-                    img=ani, x=self.pos[0], y=self.pos[1]
-                )
-                continue
+    def store_state(self):
+        """Remembers the position of the previous tick for interpolation"""
+        self.prev_pos[:] = self.pos
 
-            static = resource.image(
-                sprite_folder_url + sprite_config.mode.value + ".png"
-            )
+    def render_pos(self, alpha: float) -> np.array:
+        return self.prev_pos + (self.pos - self.prev_pos) * alpha
 
-            self.mode_sprite_map[sprite_config.mode] = sprite.Sprite(
-                img=static, x=self.pos[0], y=self.pos[1]
-            )
+    def update_sprite(self, alpha: float = 1.0):
+        """Moves the batched sprite to the interpolated position"""
+        if self.sprite is None:
+            return
 
-    def show(self):
-        if self.mode_sprite_map[self.current_mode] is None:
-            shapes.Rectangle(
-                self.pos[0],
-                self.pos[1],
-                self.hitbox[0],
-                self.hitbox[1],
-                color=self.color,
-            ).draw()
+        pos = self.render_pos(alpha)
+        current_image = self.mode_image_map[self.current_mode]
+
+        if current_image is None:
+            self.sprite.visible = False
+            if self.fallback_rect is None:
+                self.fallback_rect = shapes.Rectangle(
+                    pos[0],
+                    pos[1],
+                    self.hitbox[0],
+                    self.hitbox[1],
+                    color=self.color,
+                    batch=self.level_context.world_batch,
+                    group=self.render_group,
+                )
+            if not self.fallback_rect.visible:
+                self.fallback_rect.visible = True
+            self.fallback_rect.position = (pos[0], pos[1])
             return
 
-        current_sprite = self.mode_sprite_map[self.current_mode]
-        current_sprite.update(
+        if self.fallback_rect is not None and self.fallback_rect.visible:
+            self.fallback_rect.visible = False
+
+        if self.sprite_mode != self.current_mode:
+            self.sprite.image = current_image
+            self.sprite_mode = self.current_mode
+
+        if not self.sprite.visible:
+            self.sprite.visible = True
+        self.sprite.update(
             x=(
-                self.pos[0]
-                if self.direction[0] == Direction.RIGHT.get()[0]
-                else self.pos[0] + self.hitbox[0]
+                pos[0]
+                if self.direction[0] == Direction.RIGHT.value[0]
+                else pos[0] + self.hitbox[0]
             ),
-            y=self.pos[1],
+            y=pos[1],
+            scale_x=self.direction[0],
         )
-        current_sprite.scale_x = self.direction[0]
 
-        current_sprite.draw()
+    def hide_sprite(self):
+        if self.sprite is not None and self.sprite.visible:
+            self.sprite.visible = False
+
+        if self.fallback_rect is not None and self.fallback_rect.visible:
+            self.fallback_rect.visible = False
+
+    def delete_sprite(self):
+        """Removes the entity's drawables from the level batch"""
+        if self.sprite is not None:
+            self.sprite.delete()
+            self.sprite = None
+
+        if self.fallback_rect is not None:
+            self.fallback_rect.delete()
+            self.fallback_rect = None
+
+    def nearby_blocks(self) -> list[Block]:
+        """Blocks overlapping the hitbox swept by the current velocity"""
+        return self.level_context.tile_map.query_rect(
+            self.pos[0] + min(self.vel[0], 0),
+            self.pos[1] + min(self.vel[1], 0),
+            self.pos[0] + self.hitbox[0] + max(self.vel[0], 0),
+            self.pos[1] + self.hitbox[1] + max(self.vel[1], 0),
+        )
 
     def grounded_check(self, blocks: list[Block]):
         self.grounded = False
@@ -129,7 +206,7 @@ class Entity(Body, ABC):
                 self.vel[0] = 0
 
     def handle_ground(self):
-        self.grounded_check(self.level_context.blocks)
+        self.grounded_check(self.nearby_blocks())
 
         if self.grounded and self.vel[0] != 0:
             self.current_mode = EntityMode.WALKING
@@ -139,6 +216,6 @@ class Entity(Body, ABC):
             self.current_mode = EntityMode.JUMPING
 
         if not self.grounded:
-            self.acc = GRAVITY.copy()
+            self.acc[:] = GRAVITY
         else:
-            self.acc = np.array([0, 0])
+            self.acc[:] = 0
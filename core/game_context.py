@@ -1,7 +1,12 @@
 from enum import Enum
 from pyglet import window
+from pyglet.window import FPSDisplay
 
-from core.level_context import LevelContext
+from core.level_context import TICK_RATE, LevelContext
+from core.level_cache import LevelCache
+from core.level_loader import LevelPreloader
+from core.profiler import PROFILER, ProfilerOverlay
+from core.replay import InputRecorder, ReplayInput
 from enums.game_state import GameState
 from menus.game_over import GameOver
 from menus.main_menu import MainMenu
@@ -9,10 +14,19 @@ from pyglet.math import Mat4
 
 from menus.win import Win
 
+TICK_DT = 1 / TICK_RATE
+MAX_FRAME_TIME = 0.25
+PRELOAD_BUDGET = 0.002
+
 
 class GameContext:
-    def __init__(self, win: window.Window, levels: list[str]) -> None:
-        self.game_state = GameState.MAIN_MENU
+    def __init__(
+        self,
+        win: window.Window,
+        levels: list[str],
+        level_cache: LevelCache = None,
+    ) -> None:
+        self._game_state = GameState.MAIN_MENU
         self.current_level: LevelContext = None
         self.main_menu = MainMenu(win, self)
         self.game_over = GameOver(win, self)
@@ -20,28 +34,82 @@ class GameContext:
         self.win = win
         self.levels = levels
         self.level_counter = -1
+        self.accumulator = 0.0
+        self.fps_display = FPSDisplay(win)
+        self.profiler_overlay = ProfilerOverlay()
+        # Recorder or replay the tick inputs go through, live keys if None
+        self.input: InputRecorder | ReplayInput = None
+        self.level_cache = LevelCache() if level_cache is None else level_cache
+        self.preloader = LevelPreloader(
+            lambda data: LevelContext.build_steps(data, self.win, self),
+            self.level_cache.get,
+        )
+
+    @property
+    def game_state(self) -> GameState:
+        return self._game_state
+
+    @game_state.setter
+    def game_state(self, game_state: GameState) -> None:
+        if game_state != self._game_state:
+            PROFILER.mark(f"state {game_state.name}")
+        self._game_state = game_state
 
     def load_level(self, level_name: str) -> None:
-        self.current_level = LevelContext.load_level(level_name, self.win, self)
+        with PROFILER.span(f"load {level_name}"):
+            level = self.preloader.take(level_name)
+            if level is None:
+                level = LevelContext.from_data(
+                    self.level_cache.get(level_name), self.win, self
+                )
+
+        self.current_level = level
         self.game_state = GameState.IN_GAME
+        self.accumulator = 0.0
+
+        if self.level_counter + 1 < len(self.levels):
+            self.preloader.start(self.levels[self.level_counter + 1])
 
     def next_level(self):
-        self.level_counter += 1
+        with PROFILER.span("next_level"):
+            self.level_counter += 1
 
-        if self.level_counter == len(self.levels):
-            self.game_state = GameState.WIN
+            if self.level_counter == len(self.levels):
+                self.game_state = GameState.WIN
+                return
+
+            self.load_level(self.levels[self.level_counter])
+
+    def update(self, dt: float, keys) -> None:
+        """Advances the simulation in fixed steps of TICK_DT"""
+        if self.game_state != GameState.IN_GAME or self.current_level is None:
+            self.accumulator = 0.0
             return
 
-        self.load_level(self.levels[self.level_counter])
+        self.accumulator += min(dt, MAX_FRAME_TIME)
+
+        while self.accumulator >= TICK_DT:
+            level = self.current_level
+            self.accumulator -= TICK_DT
+            if self.input is None:
+                level.update(keys)
+            else:
+                level.update(self.input.poll(level, keys))
+
+            if self.game_state != GameState.IN_GAME or self.current_level is not level:
+                break
+
+        with PROFILER.span("preload"):
+            self.preloader.step(PRELOAD_BUDGET)
 
-    def draw(self, win: window.Window, keys) -> None:
+    def draw(self, win: window.Window) -> None:
         match self.game_state:
             case GameState.MAIN_MENU:
                 self.main_menu.draw()
                 return
             case GameState.IN_GAME:
                 if self.current_level is not None:
-                    self.current_level.draw(win, keys)
+                    self.current_level.draw(win, self.accumulator / TICK_DT)
                 return
             case GameState.GAME_OVER:
                 self.current_level = None
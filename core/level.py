@@ -1,5 +1,7 @@
 import json
 
+import numpy as np
+
 
 class Level:
     def __init__(self) -> None:
@@ -20,6 +22,10 @@ class LevelEncoder(json.JSONEncoder):
                 "ammo": obj.ammo,
                 "level_end": obj.level_end,
             }
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.integer):
+            return int(obj)
         return json.JSONEncoder.default(self, obj)
 
 
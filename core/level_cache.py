@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.level_loader import LevelData, read_level_data
+
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Rough size of one decoded (x, y) tuple inside a list
+POINT_BYTES = 120
+
+
+def points_nbytes(points) -> int:
+    if isinstance(points, np.ndarray):
+        return points.nbytes
+    return len(points) * POINT_BYTES
+
+
+def level_data_nbytes(data: LevelData) -> int:
+    level = data.level
+    return (
+        points_nbytes(level.blocks)
+        + points_nbytes(level.enemies)
+        + points_nbytes(level.ammo)
+        + data.geometry.nbytes
+        + data.navigation.nbytes
+    )
+
+
+@dataclass
+class CacheEntry:
+    mtime: float
+    data: LevelData
+
+
+class LevelCache:
+    """LRU cache of decoded levels and their static geometry.
+
+    Entries are keyed by level file name and invalidated when the file's
+    modification time changes. The least recently used levels are evicted
+    once either limit is exceeded, but the newest entry is always kept.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, level_name: str) -> LevelData:
+        mtime = os.path.getmtime(os.path.join("levels", level_name))
+
+        with self.lock:
+            entry = self.entries.get(level_name)
+            if entry is not None and entry.mtime == mtime:
+                self.entries.move_to_end(level_name)
+                return entry.data
+
+        data = read_level_data(level_name)
+
+        with self.lock:
+            self.entries[level_name] = CacheEntry(mtime, data)
+            self.entries.move_to_end(level_name)
+            self.evict()
+
+        return data
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level_data_nbytes(entry.data) for entry in self.entries.values())
+
+    def evict(self) -> None:
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries or self.nbytes > self.max_bytes
+        ):
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
@@ -1,44 +1,68 @@
-import json
 import os
-import time
 
 import numpy as np
 import pyglet
+from core.body import boxes_colliding, boxes_of
 from core.entity import Entity
-from core.level import Level, LevelDecoder
+from core.level import Level
 from pyglet.graphics import Batch
 from pyglet import shapes, window, image, sprite
 from pyglet.math import Mat4
-from pyglet.window import key, FPSDisplay
 
 from entities.ammo import Ammo
 from entities.bullet import Bullet
 from entities.enemy import Enemy
+from entities.enemy_pool import EnemyPool
 from entities.player import Player
 from entities.portal import Portal
 from objects.block import Block
+from core.level_geometry import BLOCK_WIDTH, LevelGeometry
+from core.navigation import NavGraph
+from core.level_loader import BuildSteps, LevelData, finish_steps, read_level_data
+from core.profiler import PROFILER
+from core.terrain import Terrain
+from core.tile_map import TileMap
 
-BLOCK_WIDTH = 30
-WHITE = (255, 255, 255)
+TICK_RATE = 60
+CULL_MARGIN = 100
+STREAM_RADIUS = 1200
+BUILD_STEP_SIZE = 16
 
 
 class LevelContext:
-    def __init__(self, win: window.Window, game_context) -> None:
+    def __init__(
+        self, win: window.Window, game_context, headless: bool = False
+    ) -> None:
         self.entities: list[Entity] = []
-        self.blocks: list[Block] = []
+        self.tile_map = TileMap(BLOCK_WIDTH)
+        self.geometry: LevelGeometry = None
+        self.navigation: NavGraph = None
+        self.terrain: Terrain = None
         self.level: Level = None
-        self.block_batch = Batch()
-        self.entity_batch = Batch()
-        self.ammo_batch = Batch()
+        self.level_name: str = None
+        self.headless = headless
 
         self.game_context = game_context
 
         self.player: Player = None
         self.bullets: list[Bullet] = []
         self.enemies: list[Enemy] = []
-        self.ammo: list[Ammo] = []
+        self.enemy_pool: EnemyPool = None
+        self.set_ammo([])
         self.portal: Portal = None
 
+        self.tick = 0
+        self.camera_pos = (0, 0)
+        self.viewport: tuple[float, float, float, float] = None
+        self.stream_rect: tuple[float, float, float, float] = None
+        self.shown_entities: dict[int, Entity] = {}
+
+        if not headless:
+            self.create_render_objects(win)
+
+    def create_render_objects(self, win: window.Window):
+        self.world_batch = Batch()
+
         self.player_health_bar_max = shapes.Rectangle(
             0,
             0,
@@ -61,8 +85,6 @@ class LevelContext:
         )
 
         self.player_y_offset = win.height // 4
-        self.fps_display = FPSDisplay(win)
-        self.camera_pos = (0, 0)
         self.ammo_img = sprite.Sprite(
             x=0,
             y=0,
@@ -80,10 +102,23 @@ class LevelContext:
             anchor_y="center",
         )
 
-    def draw(self, win: window.Window, keys):
+    @property
+    def time(self) -> float:
+        """Simulation time in seconds, advances only with ticks"""
+        return self.tick / TICK_RATE
+
+    def draw(self, win: window.Window, alpha: float = 1.0):
+        player_pos = self.player.render_pos(alpha)
         self.camera_pos = (
-            self.player.pos[0] - win.width // 2,
-            self.player.pos[1] - self.player_y_offset,
+            player_pos[0] - win.width // 2,
+            player_pos[1] - self.player_y_offset,
+        )
+
+        self.viewport = (
+            self.camera_pos[0] - CULL_MARGIN,
+            self.camera_pos[1] - CULL_MARGIN,
+            self.camera_pos[0] + win.width + CULL_MARGIN,
+            self.camera_pos[1] + win.height + CULL_MARGIN,
         )
 
         win.view = Mat4().translate(
@@ -100,18 +135,41 @@ class LevelContext:
 
         self.ammo_count.text = str(self.player.ammo_count)
 
-        self.update(keys)
-        self.show(self.camera_pos, win)
+        with PROFILER.span("show"):
+            self.show(self.camera_pos, win, alpha)
 
-        self.fps_display.label.x = self.camera_pos[0] + win.width - 100
-        self.fps_display.label.y = self.camera_pos[1] + win.height - 50
-        self.fps_display.draw()
+        fps_display = self.game_context.fps_display
+        fps_display.label.x = self.camera_pos[0] + win.width - 100
+        fps_display.label.y = self.camera_pos[1] + win.height - 50
+        fps_display.draw()
 
-    def show(self, camera_pos: np.array, win: window.Window):
-        self.block_batch.draw()
-        self.ammo_batch.draw()
-        # self.entity_batch.draw()
-        self.player.show()
+        self.game_context.profiler_overlay.draw(
+            self.camera_pos[0] + win.width - 340, self.camera_pos[1] + win.height - 80
+        )
+
+    def show(self, camera_pos: np.array, win: window.Window, alpha: float = 1.0):
+        previously_shown = self.shown_entities
+        self.shown_entities = {}
+
+        self.show_entities(
+            self.enemy_pool.members,
+            self.in_view(self.enemy_pool.boxes()) & self.enemy_pool.alive,
+            alpha,
+        )
+        self.show_entities(self.ammo, self.in_view(self.ammo_boxes), alpha)
+        self.show_entities(self.bullets, self.in_view(boxes_of(self.bullets)), alpha)
+        self.show_entities(
+            [self.player, self.portal],
+            self.in_view(boxes_of([self.player, self.portal])),
+            alpha,
+        )
+
+        for entity_id, entity in previously_shown.items():
+            if entity_id not in self.shown_entities:
+                entity.hide_sprite()
+
+        self.terrain.draw(self.viewport)
+        self.world_batch.draw()
 
         self.player_health_bar_max.x = camera_pos[0] + 20
         self.player_health_bar_max.y = camera_pos[1] + win.height - 50
@@ -130,91 +188,205 @@ class LevelContext:
         self.ammo_count.y = camera_pos[1] + win.height - 45
         self.ammo_count.draw()
 
-        for enemy in self.enemies:
-            enemy.show()
+    def in_view(self, boxes: np.ndarray) -> np.ndarray:
+        x0, y0, x1, y1 = self.viewport
+        return boxes_colliding(
+            np.array([[x0, y0, x1 - x0, y1 - y0]], dtype=float), boxes
+        )[0]
+
+    def show_entities(self, entities: list[Entity], visible: np.ndarray, alpha: float):
+        """Updates sprites of the visible entities. Sprites start hidden and
+        `show` hides them again once they leave the view."""
+        for i in np.flatnonzero(visible):
+            entity = entities[i]
+            entity.update_sprite(alpha)
+            self.shown_entities[id(entity)] = entity
+
+    def stream_focus(self) -> tuple[float, float, float, float]:
+        """The rect terrain is kept loaded in, around the player and the viewport"""
+        x, y = self.player.center
+        focus = (
+            x - STREAM_RADIUS,
+            y - STREAM_RADIUS,
+            x + STREAM_RADIUS,
+            y + STREAM_RADIUS,
+        )
 
-        for ammo in self.ammo:
-            ammo.show()
+        if self.viewport is not None:
+            focus = (
+                min(focus[0], self.viewport[0]),
+                min(focus[1], self.viewport[1]),
+                max(focus[2], self.viewport[2]),
+                max(focus[3], self.viewport[3]),
+            )
+        return focus
 
-        self.portal.show()
+    def stream_terrain(self):
+        """Keeps terrain loaded around the player and the viewport"""
+        self.stream_rect = self.stream_focus()
+        self.terrain.update(self.stream_rect)
 
     def update(self, keys):
-        self.player.update(keys)
-        for enemy in self.enemies:
-            enemy.update()
-        self.handle_bullets()
-        self.handle_ammo_pickup()
-        self.portal.update()
+        with PROFILER.span("update"):
+            self.tick += 1
+            with PROFILER.span("terrain"):
+                self.stream_terrain()
+
+            self.player.store_state()
+            self.enemy_pool.store_state()
+            for bullet in self.bullets:
+                bullet.store_state()
+
+            with PROFILER.span("player"):
+                self.player.update(keys)
+            with PROFILER.span("enemies"):
+                self.enemy_pool.update()
+            with PROFILER.span("bullets"):
+                self.handle_bullets()
+            with PROFILER.span("ammo"):
+                self.handle_ammo_pickup()
+            with PROFILER.span("portal"):
+                self.portal.update()
 
     def handle_bullets(self):
-        bullets_to_render = []
-
+        # Past the streamed rect no terrain is loaded to stop a bullet, so it
+        # would fly through walls there
+        x0, y0, x1, y1 = self.stream_rect
+        bullets = []
         for bullet in self.bullets:
-            if time.time() > bullet.lifetime:
+            if (
+                self.time > bullet.lifetime
+                or bullet.pos[0] < x0
+                or bullet.pos[1] < y0
+                or bullet.pos[0] + bullet.hitbox[0] > x1
+                or bullet.pos[1] + bullet.hitbox[1] > y1
+            ):
+                bullet.delete_sprite()
                 continue
+            bullets.append(bullet)
 
-            enemy_for_removal = None
-            enemy_colliding = False
-            for i, enemy in enumerate(self.enemies):
-                if bullet.is_colliding(enemy):
-                    enemy_colliding = True
-                    enemy_for_removal = i
-                    break
+        if len(bullets) == 0:
+            self.bullets = bullets
+            return
 
-            if enemy_colliding:
-                del self.enemies[enemy_for_removal]
+        bullet_boxes = boxes_of(bullets)
+        spent = np.zeros(len(bullets), dtype=bool)
+
+        enemy_hits = boxes_colliding(bullet_boxes, self.enemy_pool.boxes())
+        for i in np.flatnonzero(enemy_hits.any(axis=1)):
+            targets = np.flatnonzero(enemy_hits[i] & self.enemy_pool.alive)
+            if len(targets) == 0:
                 continue
 
-            for block in self.blocks:
-                if bullet.is_colliding(block):
-                    break
-            else:
-                bullets_to_render.append(bullet)
+            self.enemy_pool.kill(targets[0])
+            spent[i] = True
+
+        if spent.any():
+            for enemy in self.enemies:
+                if not self.enemy_pool.alive[enemy.index]:
+                    enemy.delete_sprite()
+            self.enemies = [
+                enemy for enemy in self.enemies if self.enemy_pool.alive[enemy.index]
+            ]
+
+        blocks: dict[int, Block] = {}
+        for bullet in bullets:
+            for block in self.tile_map.query_rect(
+                bullet.pos[0],
+                bullet.pos[1],
+                bullet.pos[0] + bullet.hitbox[0],
+                bullet.pos[1] + bullet.hitbox[1],
+            ):
+                blocks[id(block)] = block
+
+        if len(blocks) > 0:
+            spent |= boxes_colliding(
+                bullet_boxes, boxes_of(list(blocks.values()))
+            ).any(axis=1)
+
+        self.bullets = []
+        for bullet, hit in zip(bullets, spent):
+            if hit:
+                bullet.delete_sprite()
+                continue
+            self.bullets.append(bullet)
 
-        self.bullets = bullets_to_render
         for bullet in self.bullets:
             bullet.update()
-            bullet.show()
 
     def handle_ammo_pickup(self):
-        remaining_ammo = []
+        if len(self.ammo) == 0:
+            return
+
+        picked = self.player.colliding_mask_into(
+            self.ammo_boxes, self.ammo_ends, self.ammo_hits, self.ammo_scratch
+        )
+        if not picked.any():
+            return
 
-        for ammo in self.ammo:
-            if ammo.is_colliding(self.player):
-                self.player.ammo_count += 1
+        self.player.ammo_count += int(picked.sum())
+        remaining_ammo = []
+        for ammo, hit in zip(self.ammo, picked):
+            if hit:
+                ammo.delete_sprite()
                 continue
             remaining_ammo.append(ammo)
 
-        self.ammo = remaining_ammo
+        self.set_ammo(remaining_ammo)
 
-    @staticmethod
-    def load_level(level_name: str, win, game_context):
-        context = LevelContext(win, game_context)
-
-        with open(os.path.join("levels", level_name), "r") as f:
-            level = json.load(f, cls=LevelDecoder)
-            context.level = level
+    def set_ammo(self, ammo: list[Ammo]):
+        """Replaces the ammo along with its boxes and the pickup buffers, so
+        checking for pickups each tick allocates nothing"""
+        self.ammo = ammo
+        self.ammo_boxes = boxes_of(ammo)
+        self.ammo_ends = self.ammo_boxes[:, :2] + self.ammo_boxes[:, 2:]
+        self.ammo_hits = np.empty(len(ammo), dtype=bool)
+        self.ammo_scratch = np.empty(len(ammo), dtype=bool)
 
-        for block_pos in context.level.blocks:
-            block = Block(
-                block_pos[0], block_pos[1], BLOCK_WIDTH, BLOCK_WIDTH, color=WHITE
-            )
-            block.add_to_batch(context.block_batch)
+    @staticmethod
+    def load_level(level_name: str, win, game_context, headless: bool = False):
+        return LevelContext.from_data(
+            read_level_data(level_name), win, game_context, headless
+        )
 
-            context.blocks.append(block)
+    @staticmethod
+    def from_data(data: LevelData, win, game_context, headless: bool = False):
+        return finish_steps(LevelContext.build_steps(data, win, game_context, headless))
 
-        for enemy_pos in context.level.enemies:
-            enemy = Enemy(enemy_pos, context)
-            context.enemies.append(enemy)
+    @staticmethod
+    def build_steps(
+        data: LevelData, win, game_context, headless: bool = False
+    ) -> BuildSteps:
+        """Builds the context piece by piece, yielding between pieces"""
+        context = LevelContext(win, game_context, headless)
+
+        context.level = data.level
+        context.level_name = data.name
+        context.geometry = data.geometry
+        context.navigation = data.navigation
+        context.terrain = Terrain(context.geometry, context.tile_map, headless)
+        yield
+
+        context.enemy_pool = EnemyPool(context.level.enemies, context, lazy=True)
+        while context.enemy_pool.create_members(BUILD_STEP_SIZE):
+            yield
+        context.enemies = list(context.enemy_pool.members)
 
         for ammo_pos in context.level.ammo:
             ammo = Ammo(ammo_pos[0], ammo_pos[1], context)
             context.ammo.append(ammo)
+            if len(context.ammo) % BUILD_STEP_SIZE == 0:
+                yield
+        context.set_ammo(context.ammo)
 
         context.portal = Portal(
             context.level.level_end[0], context.level.level_end[1], context
         )
 
         context.player = Player(context.level.player_spawn, context)
+        yield
+
+        yield from context.terrain.load_steps(context.stream_focus())
+        context.stream_terrain()
 
         return context
@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+from core.level import Level, LevelDecoder, LevelEncoder
+
+JSON_EXTENSION = ".json"
+BINARY_EXTENSION = ".lvl"
+LEVEL_EXTENSIONS = (JSON_EXTENSION, BINARY_EXTENSION)
+
+# magic, version, flags, spawn x/y, end x/y, block/enemy/ammo counts
+HEADER = struct.Struct("<4sHHiiiiIII")
+MAGIC = b"ONLV"
+VERSION = 1
+HAS_SPAWN = 1
+HAS_END = 2
+
+COORD_DTYPE = np.dtype("<i4")
+
+
+def is_level_file(file_name: str) -> bool:
+    return os.path.splitext(file_name)[1] in LEVEL_EXTENSIONS
+
+
+def level_order(stem: str) -> list:
+    """Sort key putting level_2 before level_10"""
+    return [
+        int(part) if part.isdigit() else part for part in re.split(r"(\d+)", stem)
+    ]
+
+
+def level_files(directory: str) -> list[str]:
+    """Level files in directory in level order, one per level.
+    A converted .lvl is picked over the .json it came from."""
+    files = {}
+    for file_name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(file_name)
+        if extension in LEVEL_EXTENSIONS and (
+            stem not in files or extension == BINARY_EXTENSION
+        ):
+            files[stem] = file_name
+    return [files[stem] for stem in sorted(files, key=level_order)]
+
+
+def to_coords(points) -> np.ndarray:
+    """Points as an (N, 2) int32 array, refusing anything that would not round-trip"""
+    array = np.asarray(points).reshape(-1, 2)
+    coords = array.astype(COORD_DTYPE)
+    if not np.array_equal(coords, array):
+        raise ValueError("level coordinates must be 32-bit integers")
+    return coords
+
+
+def to_point(point) -> tuple[int, int]:
+    return tuple(int(value) for value in to_coords([point])[0])
+
+
+def save_binary(level: Level, path: str) -> None:
+    blocks = to_coords(level.blocks)
+    enemies = to_coords(level.enemies)
+    ammo = to_coords(level.ammo)
+
+    flags = 0
+    spawn = (0, 0)
+    end = (0, 0)
+    if level.player_spawn is not None:
+        flags |= HAS_SPAWN
+        spawn = to_point(level.player_spawn)
+    if level.level_end is not None:
+        flags |= HAS_END
+        end = to_point(level.level_end)
+
+    with open(path, "wb") as out:
+        out.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                flags,
+                *spawn,
+                *end,
+                len(blocks),
+                len(enemies),
+                len(ammo),
+            )
+        )
+        for coords in (blocks, enemies, ammo):
+            out.write(coords.tobytes())
+
+
+def load_binary(path: str, mmap: bool = True) -> Level:
+    """Reads a binary level, with coordinate arrays memory-mapped from the file"""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a level file")
+
+    magic, version, flags, sx, sy, ex, ey, *counts = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a level file")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported level version {version}")
+
+    arrays = []
+    offset = HEADER.size
+    for count in counts:
+        if count == 0:
+            arrays.append(np.empty((0, 2), dtype=COORD_DTYPE))
+        elif mmap:
+            arrays.append(
+                np.memmap(
+                    path, dtype=COORD_DTYPE, mode="r", offset=offset, shape=(count, 2)
+                )
+            )
+        else:
+            arrays.append(
+                np.fromfile(
+                    path, dtype=COORD_DTYPE, count=count * 2, offset=offset
+                ).reshape(count, 2)
+            )
+        offset += count * 2 * COORD_DTYPE.itemsize
+
+    level = Level()
+    level.player_spawn = (sx, sy) if flags & HAS_SPAWN else None
+    level.level_end = (ex, ey) if flags & HAS_END else None
+    level.blocks, level.enemies, level.ammo = arrays
+    return level
+
+
+def load_level_file(path: str) -> Level:
+    if path.endswith(BINARY_EXTENSION):
+        return load_binary(path)
+
+    with open(path, "r") as f:
+        return json.load(f, cls=LevelDecoder)
+
+
+def save_level_file(level: Level, path: str) -> None:
+    """Writes to a temporary file next to `path` and renames it over, so
+    readers never see a half written level"""
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        if path.endswith(BINARY_EXTENSION):
+            save_binary(level, temp_path)
+        else:
+            with open(temp_path, "w") as out:
+                out.write(json.dumps(level, cls=LevelEncoder, indent=4))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert levels between the JSON and binary formats"
+    )
+    parser.add_argument("source", help="level to read (.json or .lvl)")
+    parser.add_argument("target", help="level to write (.json or .lvl)")
+    args = parser.parse_args()
+
+    save_level_file(load_level_file(args.source), args.target)
@@ -0,0 +1,135 @@
+import numpy as np
+
+BLOCK_WIDTH = 30
+CHUNK_TILES = 16
+
+
+def merge_cells(
+    cells: np.ndarray, block_width: int = BLOCK_WIDTH, chunk_size: int = None
+) -> np.ndarray:
+    """Merges square cells into fewer rectangles covering exactly the same area.
+
+    Cells are first joined into horizontal runs along each row, then runs
+    with the same x and width are stacked upwards. With a `chunk_size`
+    no rectangle crosses a chunk boundary and the rectangles come sorted
+    by chunk. Returns (M, 4) int32 rows of x, y, width, height.
+    """
+    cells = np.asarray(cells, dtype=np.int32).reshape(-1, 2)
+    if len(cells) == 0:
+        return np.empty((0, 4), dtype=np.int32)
+    keys = (
+        np.zeros_like(cells)
+        if chunk_size is None
+        else np.floor_divide(cells, chunk_size)
+    )
+
+    # Row runs: sorted by chunk, y then x, a run breaks wherever the next
+    # cell is in another chunk or not the right-hand neighbour
+    order = np.lexsort((cells[:, 0], cells[:, 1], keys[:, 1], keys[:, 0]))
+    cells, keys = cells[order], keys[order]
+    unique = np.r_[True, np.any(np.diff(cells, axis=0) != 0, axis=1)]
+    cells, keys = cells[unique], keys[unique]
+    breaks = (
+        np.any(np.diff(keys, axis=0) != 0, axis=1)
+        | (np.diff(cells[:, 1]) != 0)
+        | (np.diff(cells[:, 0]) != block_width)
+    )
+    starts = np.r_[0, np.flatnonzero(breaks) + 1]
+    ends = np.r_[starts[1:], len(cells)]
+    runs = np.empty((len(starts), 4), dtype=np.int32)
+    runs[:, :2] = cells[starts]
+    runs[:, 2] = (ends - starts) * block_width
+    runs[:, 3] = block_width
+    keys = keys[starts]
+
+    # Stack runs: sorted by chunk, x, width then y, a rect breaks wherever
+    # the next run is not directly above with the same span
+    order = np.lexsort((runs[:, 1], runs[:, 2], runs[:, 0], keys[:, 1], keys[:, 0]))
+    runs, keys = runs[order], keys[order]
+    breaks = (
+        np.any(np.diff(keys, axis=0) != 0, axis=1)
+        | (np.diff(runs[:, 0]) != 0)
+        | (np.diff(runs[:, 2]) != 0)
+        | (np.diff(runs[:, 1]) != block_width)
+    )
+    starts = np.r_[0, np.flatnonzero(breaks) + 1]
+    ends = np.r_[starts[1:], len(runs)]
+    rects = runs[starts]
+    rects[:, 3] = (ends - starts) * block_width
+    return rects
+
+
+class LevelGeometry:
+    """Static terrain of a level split into square chunks.
+
+    Only plain arrays live here, no Blocks or GL objects, so the geometry
+    can be built off the main thread and shared between level instances.
+    Within each chunk the cells are merged into larger rectangles, which
+    are what both collision and rendering use.
+    """
+
+    def __init__(
+        self,
+        blocks,
+        block_width: int = BLOCK_WIDTH,
+        chunk_tiles: int = CHUNK_TILES,
+    ):
+        self.block_width = block_width
+        self.chunk_size = block_width * chunk_tiles
+
+        self.cells = np.asarray(blocks, dtype=np.int32).reshape(-1, 2)
+        self.chunks: dict[tuple[int, int], np.ndarray] = {}
+        self.vertices: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+        if len(self.cells) == 0:
+            return
+
+        rects = merge_cells(self.cells, block_width, self.chunk_size)
+        keys = np.floor_divide(rects[:, :2], self.chunk_size)
+        starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+        for key, chunk_rects in zip(
+            keys[np.r_[0, starts]].tolist(), np.split(rects, starts)
+        ):
+            self.chunks[tuple(key)] = chunk_rects
+
+    @property
+    def nbytes(self) -> int:
+        # Copy first, the cache may ask from another thread while chunks build
+        vertices = list(self.vertices.values())
+        return (
+            self.cells.nbytes
+            + sum(boxes.nbytes for boxes in self.chunks.values())
+            + sum(
+                positions.nbytes + indices.nbytes
+                for positions, indices in vertices
+            )
+        )
+
+    def chunk_keys_in_rect(self, x0, y0, x1, y1) -> list[tuple[int, int]]:
+        # A box can reach into the next chunk, so look one chunk further back
+        kx0, ky0 = int(x0 // self.chunk_size), int(y0 // self.chunk_size)
+        kx1, ky1 = int(x1 // self.chunk_size), int(y1 // self.chunk_size)
+        return [
+            (kx, ky)
+            for kx in range(kx0 - 1, kx1 + 1)
+            for ky in range(ky0 - 1, ky1 + 1)
+            if (kx, ky) in self.chunks
+        ]
+
+    def chunk_vertices(self, key: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        """Triangle vertices (x, y pairs) and indices for the boxes of a chunk"""
+        if key in self.vertices:
+            return self.vertices[key]
+
+        boxes = self.chunks[key].astype(np.float32)
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+
+        positions = np.stack((x0, y0, x1, y0, x1, y1, x0, y1), axis=1).ravel()
+        indices = (
+            np.arange(len(boxes), dtype=np.uint32)[:, np.newaxis] * 4
+            + np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+        ).ravel()
+
+        self.vertices[key] = positions, indices
+        return positions, indices
@@ -0,0 +1,138 @@
+import glob
+import os
+from dataclasses import dataclass
+
+JOURNAL_EXTENSION = ".journal"
+
+Cell = tuple[int, int]
+
+
+@dataclass
+class JournalEntry:
+    """One edit: `item` placed at or removed from every cell"""
+
+    place: bool
+    item: int
+    cells: list[Cell]
+
+
+def journal_path(level_path: str) -> str:
+    return os.path.splitext(level_path)[0] + JOURNAL_EXTENSION
+
+
+def encode_entry(entry: JournalEntry) -> str:
+    """One line like `+1 30 60 60 60`: place or remove, item, flat cells"""
+    coords = " ".join(f"{x} {y}" for x, y in entry.cells)
+    return f"{'+' if entry.place else '-'}{entry.item} {coords}\n"
+
+
+def decode_entry(line: str) -> JournalEntry:
+    op, *coords = line.split()
+    if op[0] not in "+-" or len(coords) % 2 != 0:
+        raise ValueError(f"bad journal entry {line!r}")
+    values = [int(value) for value in coords]
+    return JournalEntry(op[0] == "+", int(op[1:]), list(zip(values[::2], values[1::2])))
+
+
+def rotated_paths(path: str) -> list[str]:
+    """Journals set aside for a save that has not finished, oldest first"""
+    paths = glob.glob(glob.escape(path) + ".*")
+    return sorted(
+        (p for p in paths if p.rsplit(".", 1)[1].isdigit()),
+        key=lambda p: int(p.rsplit(".", 1)[1]),
+    )
+
+
+def read_journal(path: str) -> list[JournalEntry]:
+    """Entries of the set aside journals and the live one, in order.
+
+    A crash can cut the last line short, so lines that don't decode or
+    don't end in a newline are skipped.
+    """
+    entries = []
+    for journal in rotated_paths(path) + [path]:
+        if not os.path.exists(journal):
+            continue
+        with open(journal, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    continue
+                try:
+                    entries.append(decode_entry(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def drop_torn_line(path: str) -> None:
+    """Cuts a line a crash left unfinished off the end of the journal, so
+    the next entry doesn't get appended to it"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        keep = end
+        while keep > 0:
+            start = max(keep - 4096, 0)
+            f.seek(start)
+            newline = f.read(keep - start).rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            keep = start
+        if keep != end:
+            f.truncate(keep)
+
+
+class LevelJournal:
+    """Append-only log of builder edits kept next to the level file.
+
+    Every edit is one line written straight to the file, so the cost of
+    an edit doesn't depend on the level's size and a crash loses nothing.
+    Replaying the entries on top of the saved level restores the edits,
+    and replaying ones the level already has changes nothing since every
+    entry sets cells to present or absent.
+
+    Compaction saves the whole level: `rotate` sets the live journal aside
+    when its snapshot is taken and `discard` drops it once that snapshot
+    is on disk. Edits made while saving go to a new live journal. `size`
+    is the live journal's length in bytes, to tell when compaction pays.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        drop_torn_line(path)
+        self.size = os.path.getsize(path) if os.path.exists(path) else 0
+        # Opened on the first edit, so a session without any leaves no file
+        self.file = None
+
+    def append(self, entry: JournalEntry) -> None:
+        if self.file is None:
+            self.file = open(self.path, "a")
+        line = encode_entry(entry)
+        self.file.write(line)
+        self.file.flush()
+        self.size += len(line)
+
+    def rotate(self) -> int:
+        """Sets the live journal aside, returns its number for `discard`"""
+        rotated = rotated_paths(self.path)
+        number = int(rotated[-1].rsplit(".", 1)[1]) + 1 if rotated else 1
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.{number}")
+        self.size = 0
+        return number
+
+    def discard(self, number: int) -> None:
+        """Deletes journals set aside up to `number`, now part of the level"""
+        for rotated in rotated_paths(self.path):
+            if int(rotated.rsplit(".", 1)[1]) <= number:
+                os.remove(rotated)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
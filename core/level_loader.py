@@ -0,0 +1,110 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Generator
+
+from core.level import Level
+from core.level_file import load_level_file
+from core.level_geometry import LevelGeometry
+from core.navigation import NavGraph
+
+# Yields between build pieces and returns the finished LevelContext
+BuildSteps = Generator[None, None, object]
+
+
+@dataclass
+class LevelData:
+    """Everything about a level that can be prepared without GL"""
+
+    name: str
+    level: Level
+    geometry: LevelGeometry
+    navigation: NavGraph
+
+
+def level_data(level_name: str, level: Level) -> LevelData:
+    return LevelData(
+        level_name, level, LevelGeometry(level.blocks), NavGraph(level.blocks)
+    )
+
+
+def read_level_data(level_name: str) -> LevelData:
+    return level_data(level_name, load_level_file(os.path.join("levels", level_name)))
+
+
+def finish_steps(steps: BuildSteps):
+    """Runs a build generator to the end and returns what it built"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+class LevelPreloader:
+    """Reads a level on a worker thread, then builds it in small main-thread slices.
+
+    File reading, decoding and geometry happen off-thread. Sprites, batches
+    and other GL objects are created by `step` a little at a time, so the
+    level being played keeps its frame rate.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[LevelData], BuildSteps],
+        read: Callable[[str], LevelData] = read_level_data,
+    ) -> None:
+        self.build = build
+        self.read = read
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.level_name: str = None
+        self.future: Future = None
+        self.steps: BuildSteps = None
+        self.context = None
+
+    def reset(self) -> None:
+        self.level_name = None
+        self.future = None
+        self.steps = None
+        self.context = None
+
+    def start(self, level_name: str) -> None:
+        if self.level_name == level_name:
+            return
+
+        self.reset()
+        self.level_name = level_name
+        self.future = self.executor.submit(self.read, level_name)
+
+    def step(self, budget: float) -> None:
+        """Builds for at most `budget` seconds once the level data is read"""
+        if self.future is None or self.context is not None:
+            return
+        if not self.future.done() or self.future.exception() is not None:
+            return
+
+        if self.steps is None:
+            self.steps = self.build(self.future.result())
+
+        deadline = time.perf_counter() + budget
+        while time.perf_counter() < deadline:
+            try:
+                next(self.steps)
+            except StopIteration as done:
+                self.context = done.value
+                return
+
+    def take(self, level_name: str):
+        """The preloaded context for `level_name`, finished now if needed"""
+        if self.level_name != level_name:
+            return None
+
+        if self.context is None:
+            if self.steps is None:
+                self.steps = self.build(self.future.result())
+            self.context = finish_steps(self.steps)
+
+        context = self.context
+        self.reset()
+        return context
@@ -0,0 +1,176 @@
+import heapq
+from enum import Enum
+
+import numpy as np
+
+from core.level_geometry import BLOCK_WIDTH
+
+# Cells an enemy needs free above the floor to stand in a spot
+CLEARANCE_CELLS = 3
+# How far a jump reaches, kept a little below what the physics allows
+JUMP_HEIGHT_CELLS = 4
+JUMP_REACH_CELLS = 2
+MAX_DROP_CELLS = 20
+
+# Extra path cost of leaving the ground, so enemies walk where they can
+JUMP_COST = 2
+DROP_COST = 1
+
+# Rough memory of a set entry and of a node's cached links, for cache accounting
+CELL_BYTES = 150
+LINKS_BYTES = 500
+
+
+class Link(Enum):
+    WALK = 0
+    JUMP = 1
+    DROP = 2
+
+
+Cell = tuple[int, int]
+
+
+class NavGraph:
+    """Walkable cells of a level and the moves between them.
+
+    A node is an empty cell with a solid cell below and room above it to
+    stand. Nodes link to their walkable neighbours, to nodes a jump away
+    and to the node an enemy lands on after walking off a ledge. Nodes are
+    found up front, links are worked out the first time a search reaches
+    a node and then kept, so big levels only pay for the parts enemies
+    actually chase through.
+    """
+
+    def __init__(self, blocks, cell_size: int = BLOCK_WIDTH) -> None:
+        self.cell_size = cell_size
+        cells = np.floor_divide(
+            np.asarray(blocks, dtype=np.int64).reshape(-1, 2), cell_size
+        )
+        self.solid: set[Cell] = set(map(tuple, cells.tolist()))
+
+        # Vectorized node search: the cell above a block plus enough
+        # headroom, with membership tested on packed integer keys
+        keys = pack(cells)
+        free = np.ones(len(cells), dtype=bool)
+        for height in range(1, CLEARANCE_CELLS + 1):
+            free &= ~np.isin(pack(cells + (0, height)), keys)
+        self.nodes: set[Cell] = set(map(tuple, (cells[free] + (0, 1)).tolist()))
+
+        self.incoming_cache: dict[Cell, list[tuple[Cell, Link]]] = {}
+
+    def is_free(self, x: int, y: int, height: int = CLEARANCE_CELLS) -> bool:
+        return all((x, y + i) not in self.solid for i in range(height))
+
+    def incoming(self, node: Cell) -> list[tuple[Cell, Link]]:
+        """Nodes with a link to `node` and the kind of that link"""
+        links = self.incoming_cache.get(node)
+        if links is not None:
+            return links
+
+        x, y = node
+        links = []
+        for side in (-1, 1):
+            if (x + side, y) in self.nodes:
+                links.append(((x + side, y), Link.WALK))
+
+            for dx in range(1, JUMP_REACH_CELLS + 1):
+                for dy in range(0, JUMP_HEIGHT_CELLS + 1):
+                    if dx == 1 and dy == 0:
+                        continue
+                    source = (x + side * dx, y - dy)
+                    if source in self.nodes and self.is_free(
+                        *source, dy + CLEARANCE_CELLS
+                    ):
+                        links.append((source, Link.JUMP))
+
+        # Walking off a ledge falls straight down this column onto `node`
+        for height in range(1, MAX_DROP_CELLS + 1):
+            cell = (x, y + height)
+            if cell in self.solid or cell in self.nodes:
+                break
+            if not self.is_free(*cell):
+                continue
+            for side in (-1, 1):
+                if (x + side, y + height) in self.nodes:
+                    links.append(((x + side, y + height), Link.DROP))
+
+        self.incoming_cache[node] = links
+        return links
+
+    @property
+    def nbytes(self) -> int:
+        cells = len(self.nodes) + len(self.solid)
+        return cells * CELL_BYTES + len(self.incoming_cache) * LINKS_BYTES
+
+    def cell_of(self, x: float, y: float) -> Cell:
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def node_below(self, x: float, y: float) -> Cell:
+        """The node at or under a point, None if there is none close below"""
+        cx, cy = self.cell_of(x, y)
+        for depth in range(MAX_DROP_CELLS + 1):
+            if (cx, cy - depth) in self.nodes:
+                return (cx, cy - depth)
+        return None
+
+
+def pack(cells: np.ndarray) -> np.ndarray:
+    """One int64 per cell so membership can be tested with np.isin"""
+    return cells[:, 0] * (1 << 32) + (cells[:, 1] & 0xFFFFFFFF)
+
+
+def link_cost(source: Cell, target: Cell, link: Link) -> int:
+    distance = abs(target[0] - source[0]) + abs(target[1] - source[1])
+    match link:
+        case Link.JUMP:
+            return distance + JUMP_COST
+        case Link.DROP:
+            return distance + DROP_COST
+    return distance
+
+
+class FlowField:
+    """Next move toward one target node for every node around it.
+
+    Built by a shortest path search over reversed links from the target,
+    limited to `radius` cells, and shared by every enemy that chases.
+    """
+
+    def __init__(self, graph: NavGraph, radius: int) -> None:
+        self.graph = graph
+        self.radius = radius
+        self.target: Cell = None
+        self.moves: dict[Cell, tuple[Cell, Link]] = {}
+
+    def update(self, x: float, y: float) -> None:
+        """Retargets the field on the node under a point if that node changed"""
+        target = self.graph.node_below(x, y)
+        if target is None or target == self.target:
+            return
+
+        self.target = target
+        self.moves = {}
+        tx, ty = target
+        costs = {target: 0}
+        queue = [(0, target)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if cost > costs[node]:
+                continue
+
+            for source, link in self.graph.incoming(node):
+                if (
+                    abs(source[0] - tx) > self.radius
+                    or abs(source[1] - ty) > self.radius
+                ):
+                    continue
+
+                source_cost = cost + link_cost(source, node, link)
+                if source_cost < costs.get(source, source_cost + 1):
+                    costs[source] = source_cost
+                    self.moves[source] = (node, link)
+                    heapq.heappush(queue, (source_cost, source))
+
+    def move(self, node: Cell) -> tuple[Cell, Link]:
+        """Where to go from `node`, None at the target or without a path"""
+        return self.moves.get(node)
@@ -0,0 +1,205 @@
+import csv
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from pyglet import text
+
+HISTORY_FRAMES = 120
+OVERLAY_REFRESH_FRAMES = 15
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    start: float
+    duration: float
+    depth: int
+
+
+class NullSpan:
+    """Span handed out while profiling is off, does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("profiler", "name", "start", "depth")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.profiler.depth
+        self.profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter()
+        self.profiler.depth -= 1
+        self.profiler.current.append(
+            SpanRecord(self.name, self.start, end - self.start, self.depth)
+        )
+
+
+class Profiler:
+    """Collects named timing spans, grouped into frames.
+
+    Spans are opened with `with PROFILER.span("name"):`. While disabled
+    every span is the same shared no-op object, so the calls can stay in
+    the game loop. The last `history` frames are kept for the overlay
+    and for export.
+    """
+
+    def __init__(self, history: int = HISTORY_FRAMES) -> None:
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.frames: deque[list[SpanRecord]] = deque(maxlen=history)
+        self.marks: deque[SpanRecord] = deque(maxlen=history)
+        self.current: list[SpanRecord] = []
+        self.depth = 0
+
+    def span(self, name: str):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def mark(self, name: str) -> None:
+        """Records an instant event, like a game state change"""
+        if self.enabled:
+            self.marks.append(SpanRecord(name, time.perf_counter(), 0.0, 0))
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        self.frames.append(self.current)
+        self.current = []
+
+    def start(self, history: int = HISTORY_FRAMES) -> None:
+        """Enables profiling from a clean slate, keeping `history` frames"""
+        self.frames = deque(maxlen=history)
+        self.marks = deque(maxlen=history)
+        self.current = []
+        self.depth = 0
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.current = []
+        self.depth = 0
+
+    def clear(self) -> None:
+        self.frames.clear()
+        self.marks.clear()
+        self.current = []
+
+    def averages(self) -> dict[str, tuple[float, int]]:
+        """Mean time per frame in seconds and nesting depth of every span name"""
+        totals: dict[str, float] = {}
+        depths: dict[str, int] = {}
+        for frame in self.frames:
+            for record in sorted(frame, key=lambda record: record.start):
+                totals[record.name] = totals.get(record.name, 0.0) + record.duration
+                depths.setdefault(record.name, record.depth)
+
+        count = max(len(self.frames), 1)
+        return {name: (total / count, depths[name]) for name, total in totals.items()}
+
+    def export_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(["frame", "name", "depth", "start_ms", "duration_ms"])
+            for frame_index, frame in enumerate(self.frames):
+                for record in frame:
+                    writer.writerow(
+                        [
+                            frame_index,
+                            record.name,
+                            record.depth,
+                            f"{(record.start - self.origin) * 1000:.4f}",
+                            f"{record.duration * 1000:.4f}",
+                        ]
+                    )
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Writes the trace-event JSON read by chrome://tracing and Perfetto"""
+        events = [
+            {
+                "name": record.name,
+                "ph": "X",
+                "ts": (record.start - self.origin) * 1e6,
+                "dur": record.duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+            }
+            for frame in self.frames
+            for record in frame
+        ]
+        events += [
+            {
+                "name": record.name,
+                "ph": "i",
+                "s": "g",
+                "ts": (record.start - self.origin) * 1e6,
+                "pid": 0,
+                "tid": 0,
+            }
+            for record in self.marks
+        ]
+
+        with open(path, "w") as out:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, out)
+
+
+PROFILER = Profiler()
+
+
+class ProfilerOverlay:
+    """Rolling per-span breakdown drawn in a corner of the screen"""
+
+    def __init__(self, profiler: Profiler = PROFILER) -> None:
+        self.profiler = profiler
+        self.frames_since_refresh = OVERLAY_REFRESH_FRAMES
+        self.label = text.Label(
+            "",
+            font_name="Arial",
+            font_size=12,
+            multiline=True,
+            width=320,
+            anchor_x="left",
+            anchor_y="top",
+            color=(255, 255, 255, 255),
+        )
+
+    def refresh(self) -> None:
+        lines = [
+            f"{'  ' * depth}{name}: {average * 1000:.2f} ms"
+            for name, (average, depth) in self.profiler.averages().items()
+        ]
+        self.label.text = "\n".join(lines) if lines else "profiling..."
+
+    def draw(self, x: float, y: float) -> None:
+        if not self.profiler.enabled:
+            return
+
+        self.frames_since_refresh += 1
+        if self.frames_since_refresh >= OVERLAY_REFRESH_FRAMES:
+            self.frames_since_refresh = 0
+            self.refresh()
+
+        self.label.x = x
+        self.label.y = y
+        self.label.draw()
@@ -0,0 +1,724 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+if __name__ == "__main__":
+    import pyglet
+
+    # From the command line there is no display, so pyglet must not open its
+    # shadow window when the entity modules import the GL module.
+    pyglet.options["shadow_window"] = False
+
+from core.entity import GRAVITY, JUMP_ACC  # noqa: E402
+from core.level import Level  # noqa: E402
+from core.level_file import level_files, load_level_file  # noqa: E402
+from core.level_geometry import BLOCK_WIDTH, LevelGeometry  # noqa: E402
+from entities.ammo import AMMO_WIDTH  # noqa: E402
+from entities.enemy import ENEMY_HEIGHT, ENEMY_WIDTH  # noqa: E402
+from entities.player import PLAYER_HEIGHT, PLAYER_WIDTH  # noqa: E402
+from entities.portal import PORTAL_HEIGHT, PORTAL_WIDTH  # noqa: E402
+
+# Bump when the analysis changes so cached reports are recomputed
+ANALYSIS_VERSION = 3
+CACHE_DIR = os.path.join(".cache", "reachability")
+
+PLAYER_SPEED = 10
+# Furthest a jump or fall is steered sideways, well past the 13 cells a
+# jump covers at the same height, and how long one move may take
+MAX_REACH_CELLS = 16
+MAX_MOVE_TICKS = 240
+# Spots whose moves are simulated together, bounds the memory of a batch
+SIMULATE_BATCH = 16384
+
+
+@dataclass
+class ReachabilityReport:
+    level_name: str
+    spawn_grounded: bool = False
+    portal_reachable: bool = None
+    unreachable_ammo: list[list[int]] = field(default_factory=list)
+    unreachable_enemies: list[list[int]] = field(default_factory=list)
+    standing_spots: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def problems(self) -> list[str]:
+        problems = []
+        if not self.spawn_grounded:
+            problems.append("player spawn falls out of the level")
+        if self.portal_reachable is None:
+            problems.append("level has no portal")
+        elif not self.portal_reachable:
+            problems.append("portal can't be reached")
+        problems.extend(
+            f"ammo at {tuple(ammo)} can't be collected"
+            for ammo in self.unreachable_ammo
+        )
+        problems.extend(
+            f"enemy at {tuple(enemy)} can't be reached"
+            for enemy in self.unreachable_enemies
+        )
+        return problems
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def summary(self) -> str:
+        if self.ok:
+            return (
+                f"{self.level_name}: ok, {self.standing_spots} standing spots "
+                f"({self.elapsed:.2f}s)"
+            )
+        return "\n".join(
+            [f"{self.level_name}: {len(self.problems)} problem(s)"]
+            + [f"    {problem}" for problem in self.problems]
+        )
+
+
+class Bands:
+    """Rows lo..hi (exclusive) of every column packed into one flat array.
+
+    Only these rows are stored, so a grid costs as much as the rows that
+    are actually occupied rather than the level's bounding box. Index
+    `size` stands for every cell outside the bands, arrays from `zeros`
+    have one extra element there that stays empty. The outermost columns
+    are kept empty and looked up columns have to lie in between.
+    """
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray) -> None:
+        empty = hi <= lo
+        self.lo = np.where(empty, 0, lo).astype(np.int32)
+        self.height = np.where(empty, 0, hi - lo).astype(np.uint32)
+        self.offset = np.concatenate(([0], np.cumsum(self.height)[:-1])).astype(
+            np.int64
+        )
+        self.size = int(self.height.sum())
+        self.base = self.offset - self.lo
+
+        # Flat indices of the lowest and highest row of every column
+        self.first = self.zeros()
+        self.first[self.offset[~empty]] = True
+        self.last = self.zeros()
+        self.last[self.offset[~empty] + self.height[~empty] - 1] = True
+
+    def zeros(self, dtype=bool) -> np.ndarray:
+        return np.zeros(self.size + 1, dtype=dtype)
+
+    def index(self, cols: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        # Rows below lo wrap around to huge unsigned values
+        inside = (rows - self.lo.take(cols)).astype(np.uint32) < self.height.take(cols)
+        return np.where(inside, self.base.take(cols) + rows, self.size)
+
+    def coords(self, index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Empty columns share their offset with the next one, the last
+        # column at or before the index is the one holding it
+        cols = np.searchsorted(self.offset, index, side="right") - 1
+        return cols, (index - self.base[cols]).astype(np.int32)
+
+    def cells(self) -> tuple[np.ndarray, np.ndarray]:
+        """Column and row of every cell in the bands, in flat order"""
+        cols = np.repeat(np.arange(len(self.lo), dtype=np.int32), self.height)
+        return cols, (np.arange(self.size) - self.base[cols]).astype(np.int32)
+
+
+def row_bands(cols: np.ndarray, rows_lo: np.ndarray, rows_hi: np.ndarray, count: int):
+    """Per column the lowest and one past the highest row of the given ranges"""
+    lo = np.full(count, np.iinfo(np.int32).max, dtype=np.int64)
+    hi = np.full(count, np.iinfo(np.int32).min, dtype=np.int64)
+    np.minimum.at(lo, cols, rows_lo)
+    np.maximum.at(hi, cols, rows_hi + 1)
+    return lo, hi
+
+
+def window(values: np.ndarray, radius: int, reduce) -> np.ndarray:
+    """`reduce` of every value with its neighbours up to `radius` away"""
+    out = values.copy()
+    for shift in range(1, radius + 1):
+        out[shift:] = reduce(out[shift:], values[:-shift])
+        out[:-shift] = reduce(out[:-shift], values[shift:])
+    return out
+
+
+def side_rows(cell_size: int) -> list[tuple[int, int]]:
+    """Rows above the feet the middle half of the player's height overlaps,
+    first and last, for every height within a cell"""
+    return [
+        (
+            (4 * d + PLAYER_HEIGHT) // (4 * cell_size),
+            -(-(4 * d + 3 * PLAYER_HEIGHT) // (4 * cell_size)) - 1,
+        )
+        for d in range(cell_size)
+    ]
+
+
+class LevelGrid:
+    """Solid cells of a level, kept per column only between the lowest and
+    highest block of the column.
+
+    Players move in whole steps from grid positions, so every x they reach
+    lies on one lattice. Blocks under the player's width and at its edges
+    are worked out per lattice column up front, again only for the rows
+    around its blocks. Cells outside the bands are empty air.
+
+    The game collides with the merged rectangles of `LevelGeometry`, so a
+    seam between two cells of one rectangle counts as inside the block
+    while a seam between rectangles does not.
+
+    A player stands at one pixel below the top of the block under it, spot
+    row `r` of a lattice column is the one at height `r * cell_size - 1`.
+    Spots a player can stand on that are joined by walking along a floor
+    form a run. The first spot of a run stands for all of it in `node`,
+    so reaching one reaches all of them without simulating the walk.
+    """
+
+    def __init__(self, level: Level, cell_size: int = BLOCK_WIDTH) -> None:
+        self.cell_size = cell_size
+        cells = np.floor_divide(
+            np.asarray(level.blocks, dtype=np.int64).reshape(-1, 2), cell_size
+        )
+        points = [cells] + [
+            np.floor_divide(
+                np.asarray(points, dtype=np.int64).reshape(-1, 2), cell_size
+            )
+            for points in (
+                level.enemies,
+                level.ammo,
+                [p for p in (level.player_spawn, level.level_end) if p is not None],
+            )
+        ]
+        points = np.concatenate(points)
+
+        # Room to steer past the outermost blocks, no move goes further
+        pad = MAX_REACH_CELLS + PLAYER_WIDTH // cell_size + 2
+        self.col_origin = int(points[:, 0].min()) - pad
+        columns = int(points[:, 0].max()) + pad - self.col_origin + 1
+        cols = cells[:, 0] - self.col_origin
+        self.solid_bands = Bands(*row_bands(cols, cells[:, 1], cells[:, 1], columns))
+        self.solid = self.solid_bands.zeros()
+        self.solid[self.solid_bands.index(cols, cells[:, 1])] = True
+
+        # Cells sharing a rectangle with the cell to their left or below
+        rects = np.floor_divide(
+            np.concatenate(
+                [np.empty((0, 4), dtype=np.int32)]
+                + list(LevelGeometry(level.blocks, cell_size).chunks.values())
+            ).astype(np.int64),
+            cell_size,
+        )
+        areas = rects[:, 2] * rects[:, 3]
+        local = np.arange(areas.sum()) - np.repeat(np.cumsum(areas) - areas, areas)
+        dx = local % np.repeat(rects[:, 2], areas)
+        dy = local // np.repeat(rects[:, 2], areas)
+        index = self.solid_bands.index(
+            np.repeat(rects[:, 0], areas) + dx - self.col_origin,
+            np.repeat(rects[:, 1], areas) + dy,
+        )
+        self.joined_left = self.solid_bands.zeros()
+        self.joined_left[index[dx > 0]] = True
+        self.joined_below = self.solid_bands.zeros()
+        self.joined_below[index[dy > 0]] = True
+        del rects, areas, local, dx, dy, index
+
+        self.step_offset = (
+            0 if level.player_spawn is None else int(level.player_spawn[0])
+        ) % PLAYER_SPEED
+        self.lattice_origin = self.col_origin * cell_size // PLAYER_SPEED
+        lattice_x = (
+            np.arange(columns * cell_size // PLAYER_SPEED) + self.lattice_origin
+        ) * PLAYER_SPEED + self.step_offset
+        col_lo = lattice_x // cell_size - self.col_origin
+        col_hi = -np.floor_divide(-(lattice_x + PLAYER_WIDTH), cell_size) - 1
+        col_hi -= self.col_origin
+
+        # A lattice column holds the rows of every grid column under the
+        # player, one more above to stand on the highest block, and enough
+        # below for a player whose body reaches up to the lowest one
+        side_reach = max(last for _, last in side_rows(cell_size))
+        bands = self.solid_bands
+        lo = np.full(len(lattice_x), np.iinfo(np.int32).max, dtype=np.int64)
+        hi = np.full(len(lattice_x), np.iinfo(np.int32).min, dtype=np.int64)
+        for i in range(int((col_hi - col_lo).max()) + 1):
+            cols = np.minimum(col_lo + i, columns - 1)
+            has_rows = (col_lo + i <= col_hi) & (bands.height[cols] > 0)
+            lo = np.where(has_rows, np.minimum(lo, bands.lo[cols]), lo)
+            hi = np.where(
+                has_rows, np.maximum(hi, bands.lo[cols] + bands.height[cols] + 1), hi
+            )
+
+        # Lowest height a player falling near each lattice column can still
+        # be held up at, just above the bottom of the lowest block. Steering
+        # never takes one further than twice the reach.
+        lowest = window(
+            np.where(hi > lo, lo, np.iinfo(np.int32).max // cell_size - 1),
+            2 * MAX_REACH_CELLS * cell_size // PLAYER_SPEED,
+            np.minimum,
+        )
+        self.lowest_landing = (lowest * cell_size + 1).astype(np.int32)
+
+        self.lattice = Bands(lo - side_reach, hi)
+        lattice_cols, rows = self.lattice.cells()
+        x = lattice_x[lattice_cols]
+        del lattice_cols
+        # Blocks under the player's width inside a row and on the seam at
+        # its bottom
+        col_lo = x // cell_size
+        col_hi = -np.floor_divide(-(x + PLAYER_WIDTH), cell_size) - 1
+        self.support = self.lattice.zeros()
+        self.support[:-1] = self.columns_solid(col_lo, col_hi, rows)
+        self.seams = self.lattice.zeros()
+        self.seams[:-1] = self.columns_solid(col_lo, col_hi, rows, self.joined_below)
+        del col_lo, col_hi
+
+        # Blocks an edge of the player is strictly inside, an edge on a
+        # column boundary only is if the cells either side share a rectangle
+        edges = self.lattice.zeros()
+        for edge in (x, x + PLAYER_WIDTH):
+            inside = edge % cell_size != 0
+            edges[:-1] |= np.where(
+                inside,
+                self.columns_solid(edge // cell_size, edge // cell_size, rows),
+                self.columns_solid(
+                    edge // cell_size, edge // cell_size, rows, self.joined_left
+                ),
+            )
+        del x, rows
+
+        # Whether the player's sides hit a block, per feet cell and for each
+        # kind of height within the cell. `sides` holds one table per kind.
+        kinds = sorted(set(side_rows(cell_size)))
+        self.side_kind = np.array(
+            [kinds.index(side) for side in side_rows(cell_size)], dtype=np.int32
+        )
+        height = self.lattice.height.astype(np.int64)
+        rows_above = (
+            np.repeat(self.lattice.offset + height, height)
+            - np.arange(self.lattice.size)
+            - 1
+        )
+        self.sides = np.zeros((len(kinds), self.lattice.size + 1), dtype=bool)
+        for kind, (first, last) in enumerate(kinds):
+            for row in range(first, last + 1):
+                end = self.lattice.size - row
+                self.sides[kind, :end] |= edges[row : self.lattice.size] & (
+                    rows_above[:end] >= row
+                )
+        del rows_above
+        self.sides = self.sides.ravel()
+
+        # Standing spots have a block under the player's feet
+        below = np.roll(self.support, 1) & ~self.lattice.first
+        above = np.roll(edges, -1) & ~self.lattice.last
+        walkable = below & ~edges & ~above
+        walkable[-1] = False
+        spots = (below & ~self.support) | walkable
+        spots[-1] = False
+        self.candidates = np.flatnonzero(spots)
+        del below, above, edges, spots
+
+        walk = np.flatnonzero(walkable)
+        walk_cols, walk_rows = self.lattice.coords(walk)
+        order = np.lexsort((walk_cols, walk_rows))
+        walk, walk_cols, walk_rows = walk[order], walk_cols[order], walk_rows[order]
+        breaks = (np.diff(walk_rows) != 0) | (np.diff(walk_cols) != 1)
+        starts = np.r_[0, np.flatnonzero(breaks) + 1][: len(walk)]
+        ends = np.r_[starts[1:], len(walk)] - 1
+
+        self.node = np.arange(self.lattice.size + 1, dtype=np.int32)
+        self.node[walk] = np.repeat(walk[starts], ends - starts + 1)
+        self.left_end = self.lattice.zeros()
+        self.left_end[walk[starts]] = True
+        self.right_end = self.lattice.zeros()
+        self.right_end[walk[ends]] = True
+        self.walkable = walkable
+
+    def columns_solid(
+        self,
+        col_lo: np.ndarray,
+        col_hi: np.ndarray,
+        rows: np.ndarray,
+        cells: np.ndarray = None,
+    ) -> np.ndarray:
+        """Whether any of columns col_lo..col_hi has a solid cell in the row,
+        or one set in `cells` if given"""
+        hit = np.zeros(len(col_lo), dtype=bool)
+        for i in range(int((col_hi - col_lo).max(initial=0)) + 1):
+            cols = col_lo + i
+            hit |= (cols <= col_hi) & self.is_solid(
+                np.minimum(cols, col_hi), rows, cells
+            )
+        return hit
+
+    def is_solid(
+        self, cols: np.ndarray, rows: np.ndarray, cells: np.ndarray = None
+    ) -> np.ndarray:
+        cells = self.solid if cells is None else cells
+        return cells[self.solid_bands.index(cols - self.col_origin, rows)]
+
+    def lattice_col(self, x: np.ndarray) -> np.ndarray:
+        return x // PLAYER_SPEED - self.lattice_origin
+
+    def spot_position(self, index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        cols, rows = self.lattice.coords(index)
+        x = (cols + self.lattice_origin) * PLAYER_SPEED + self.step_offset
+        return x, rows * self.cell_size - 1
+
+    def under_feet(self, cols: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Mirrors `Body.is_bottom_colliding`: height `y` strictly inside a
+        block overlapping the player's width in lattice `cols`"""
+        size = self.cell_size
+        index = self.lattice.index(cols, y // size)
+        return np.where(y % size == 0, self.seams[index], self.support[index])
+
+    def blocks_sides(self, cols: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Mirrors `Body.are_sides_colliding`: an edge of the player in lattice
+        `cols` strictly inside a block that overlaps the middle half of its
+        height"""
+        size = self.cell_size
+        index = self.lattice.index(cols, y // size)
+        return self.sides[self.side_kind[y % size] * (self.lattice.size + 1) + index]
+
+
+def simulate(
+    grid: LevelGrid,
+    touch: Bands,
+    x: np.ndarray,
+    y: np.ndarray,
+    target_x: np.ndarray,
+    jump: np.ndarray,
+    source: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Moves many players at once by the `Player.update` rules.
+
+    Each one starts standing still, jumps on the first tick where `jump`
+    is set and heads for `target_x` at the player speed until it comes to
+    rest on a block. Like in the game, the ground is checked where the
+    last speed would take the player before it moves, and the sides where
+    the next step takes it.
+
+    Returns the `source` of every player with the spot it came to stand on
+    as (N, 2) pairs, and the cells of `touch` its corner passed as
+    `source * (touch.size + 1) + cell` keys.
+    """
+    size = grid.cell_size
+    x, y, target_x = (np.asarray(a, dtype=np.int32) for a in (x, y, target_x))
+    vy = np.zeros(len(x), dtype=np.int32)
+    jump = np.asarray(jump, dtype=bool)
+    source = np.asarray(source, dtype=np.int64)
+    landings, touches = [], []
+
+    for tick in range(MAX_MOVE_TICKS):
+        if len(x) == 0:
+            break
+
+        cols = grid.lattice_col(x)
+        down = np.flatnonzero(vy <= 0)
+        grounded = np.zeros(len(x), dtype=bool)
+        grounded[down] = grid.under_feet(cols[down], y[down] + vy[down])
+        vx = np.clip(target_x - x, -PLAYER_SPEED, PLAYER_SPEED)
+        blocked = (vx != 0) & grid.blocks_sides(cols + vx // PLAYER_SPEED, y)
+        vy = np.where(
+            grounded,
+            np.where(jump, JUMP_ACC[1], 0) if tick == 0 else 0,
+            vy + GRAVITY[1],
+        )
+        x = np.where(blocked, x, x + vx)
+        y = y + vy
+        cols = grid.lattice_col(x)
+
+        cells = touch.index(x // size - grid.col_origin, y // size)
+        hit = cells != touch.size
+        touches.append(source[hit] * (touch.size + 1) + cells[hit])
+
+        # A player the ground holds without moving is at rest. One that sank
+        # into the top row of a block gets to the top by jumping in place.
+        still = np.flatnonzero(vy == 0)
+        rest = np.zeros(len(x), dtype=bool)
+        rest[still] = grid.under_feet(cols[still], y[still])
+        stand = np.flatnonzero(rest)
+        spots = grid.lattice.index(cols[stand], y[stand] // size + 1)
+        landings.append(np.stack((source[stand], spots), axis=1))
+
+        lost = (vy <= 0) & (y < grid.lowest_landing[cols])
+        keep = ~rest & ~lost
+        x, y, vy, target_x, source = (
+            x[keep],
+            y[keep],
+            vy[keep],
+            target_x[keep],
+            source[keep],
+        )
+
+    landings = np.concatenate(landings + [np.empty((0, 2), dtype=np.int64)])
+    return (
+        landings[landings[:, 1] != grid.lattice.size],
+        np.concatenate(touches + [np.empty(0, dtype=np.int64)]),
+    )
+
+
+def moves(grid: LevelGrid, spots: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Starts of every jump and walk worth trying from the spots: x, y,
+    target x, whether it jumps and the node of the spot"""
+    x, y = grid.spot_position(spots)
+
+    # Walking only leads somewhere new off either end of a run. Jumps start
+    # from the ends and once per cell in between, as their targets are a
+    # cell apart anyway.
+    lone = ~grid.walkable[spots]
+    left = lone | grid.left_end[spots]
+    right = lone | grid.right_end[spots]
+    jump = left | right | ((x - grid.step_offset) % grid.cell_size == 0)
+
+    reach = np.arange(1, MAX_REACH_CELLS + 1) * grid.cell_size
+    jump_offsets = np.concatenate((-reach[::-1], [0], reach))
+    starts, offsets, jumps = [], [], []
+    for mask, targets, jumping in (
+        (jump, jump_offsets, True),
+        (left, -reach, False),
+        (right, reach, False),
+    ):
+        starts.append(np.repeat(np.flatnonzero(mask), len(targets)))
+        offsets.append(np.tile(targets, int(mask.sum())))
+        jumps.append(np.full(len(starts[-1]), jumping))
+    starts = np.concatenate(starts)
+    return (
+        x[starts],
+        y[starts],
+        x[starts] + np.concatenate(offsets),
+        np.concatenate(jumps),
+        grid.node[spots[starts]],
+    )
+
+
+def move_graph(
+    grid: LevelGrid, touch: Bands, spawn: tuple[int, int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every move from every spot a player could stand on, simulated in
+    batches whether the spot gets reached or not.
+
+    Returns the landings as node pairs sorted by the node moved from, where
+    the spawn is node `grid.lattice.size`, and the touched cell keys of
+    `simulate`, both without duplicates.
+    """
+    stride = grid.lattice.size + 1
+    landings, touches = simulate(
+        grid,
+        touch,
+        [spawn[0]],
+        [spawn[1]],
+        [spawn[0]],
+        [False],
+        [grid.lattice.size],
+    )
+    edges = [landings[:, 0] * stride + grid.node[landings[:, 1]]]
+    touched = [touches]
+
+    # Falls can end in spots a block overlaps, which only get their own moves
+    # once something lands there
+    tried = grid.lattice.zeros()
+    spots = np.concatenate((grid.candidates, landings[:, 1]))
+    while True:
+        spots = np.unique(spots[~tried[spots]])
+        if len(spots) == 0:
+            break
+        tried[spots] = True
+
+        found = []
+        for batch in np.array_split(spots, -(-len(spots) // SIMULATE_BATCH)):
+            landings, touches = simulate(grid, touch, *moves(grid, batch))
+            found.append(landings[:, 1])
+            edges.append(np.unique(landings[:, 0] * stride + grid.node[landings[:, 1]]))
+            touched.append(np.unique(touches))
+        spots = np.concatenate(found)
+
+    sources, targets = np.divmod(np.unique(np.concatenate(edges)), stride)
+    return sources, targets, np.unique(np.concatenate(touched))
+
+
+def flood_fill(grid: LevelGrid, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Breadth-first search over the nodes of `move_graph` from the spawn,
+    returns which nodes are reached"""
+    reached = grid.lattice.zeros()
+    reached[-1] = True
+    frontier = np.array([grid.lattice.size])
+    while len(frontier):
+        lo = np.searchsorted(sources, frontier, side="left")
+        lengths = np.searchsorted(sources, frontier, side="right") - lo
+        landed = targets[
+            np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+            + np.arange(lengths.sum())
+        ]
+        frontier = np.unique(landed[~reached[landed]])
+        reached[frontier] = True
+    return reached
+
+
+def touch_cells(boxes: np.ndarray, cell_size: int) -> tuple[np.ndarray, ...]:
+    """Cells the player's corner is in while it overlaps each x, y, w, h box:
+    first and last column, first and last row"""
+    x, y, width, height = boxes.T
+    return (
+        (x - PLAYER_WIDTH) // cell_size,
+        (x + width) // cell_size,
+        (y - PLAYER_HEIGHT) // cell_size,
+        (y + height) // cell_size,
+    )
+
+
+def fall(grid: LevelGrid, x: int, y: int, width: int) -> int:
+    """Height an entity spawned at x, y comes to rest at, its own if none"""
+    size = grid.cell_size
+    cols = np.arange(x // size, -(-(x + width) // size))
+    bands = grid.solid_bands
+    filled = bands.height[cols - grid.col_origin] > 0
+    if not filled.any():
+        return y
+
+    row = y // size - 1
+    lowest = bands.lo[cols - grid.col_origin][filled].min()
+    while row >= lowest:
+        if grid.is_solid(cols, np.full(len(cols), row)).any():
+            return (row + 1) * size - 1
+        row -= 1
+    return y
+
+
+def analyze_level(level: Level, level_name: str = "") -> ReachabilityReport:
+    start = time.perf_counter()
+    report = ReachabilityReport(level_name)
+    if level.player_spawn is None:
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    grid = LevelGrid(level)
+    size = grid.cell_size
+
+    # Everything the player has to get to as x, y, w, h boxes. Only the
+    # cells touching one of them are tracked.
+    ammo = np.asarray(level.ammo, dtype=np.int64).reshape(-1, 2)
+    enemies = np.asarray(level.enemies, dtype=np.int64).reshape(-1, 2)
+    boxes = [
+        np.column_stack((ammo, np.full((len(ammo), 2), AMMO_WIDTH))),
+        np.array(
+            [
+                (x, fall(grid, x, y, ENEMY_WIDTH), ENEMY_WIDTH, ENEMY_HEIGHT)
+                for x, y in enemies.tolist()
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 4),
+    ]
+    if level.level_end is not None:
+        boxes.append(np.array([(*level.level_end, PORTAL_WIDTH, PORTAL_HEIGHT)]))
+    boxes = np.concatenate(boxes).astype(np.int64)
+
+    col_lo, col_hi, row_lo, row_hi = touch_cells(boxes, size)
+    widths = col_hi - col_lo + 1
+    first = np.cumsum(widths) - widths
+    cols = np.repeat(col_lo - first, widths) + np.arange(widths.sum())
+    touch = Bands(
+        *row_bands(
+            cols - grid.col_origin,
+            np.repeat(row_lo, widths),
+            np.repeat(row_hi, widths),
+            len(grid.solid_bands.lo),
+        )
+    )
+
+    spawn = tuple(int(v) for v in level.player_spawn)
+    sources, targets, touches = move_graph(grid, touch, spawn)
+    reached = flood_fill(grid, sources, targets)
+    spots = np.flatnonzero(reached[grid.node[:-1]])
+    report.standing_spots = len(spots)
+    report.spawn_grounded = report.standing_spots > 0
+
+    # Cells passed on the way to a spot and where the player stands
+    visited = touch.zeros()
+    sources, cells = np.divmod(touches, touch.size + 1)
+    visited[cells[reached[sources]]] = True
+    x, y = grid.spot_position(spots)
+    visited[touch.index(x // size - grid.col_origin, y // size)] = True
+    visited[-1] = False
+
+    def touched(box: int) -> bool:
+        cols, rows = np.meshgrid(
+            np.arange(col_lo[box], col_hi[box] + 1) - grid.col_origin,
+            np.arange(row_lo[box], row_hi[box] + 1),
+        )
+        return bool(visited[touch.index(cols.ravel(), rows.ravel())].any())
+
+    for i, position in enumerate(ammo.tolist()):
+        if not touched(i):
+            report.unreachable_ammo.append(position)
+    for i, position in enumerate(enemies.tolist()):
+        if not touched(len(ammo) + i):
+            report.unreachable_enemies.append(position)
+    if level.level_end is not None:
+        report.portal_reachable = touched(len(boxes) - 1)
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+_reports: dict[str, ReachabilityReport] = {}
+
+
+def analyze_file(path: str, cache_dir: str = CACHE_DIR) -> ReachabilityReport:
+    """Report for a level file, cached by the hash of its contents"""
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read())
+    digest.update(str(ANALYSIS_VERSION).encode())
+    digest = digest.hexdigest()
+    level_name = os.path.basename(path)
+
+    report = _reports.get(digest)
+    cache_path = None if cache_dir is None else os.path.join(cache_dir, digest)
+    if report is None and cache_path is not None and os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            report = ReachabilityReport(**json.load(f))
+
+    if report is None:
+        report = analyze_level(load_level_file(path), level_name)
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, "w") as out:
+                json.dump(asdict(report), out)
+
+    report.level_name = level_name
+    _reports[digest] = report
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that the portal, ammo and enemies of levels can be reached"
+    )
+    parser.add_argument(
+        "levels", nargs="*", help="level file names inside levels/, default all"
+    )
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print reports as JSON")
+    args = parser.parse_args()
+
+    levels = args.levels or level_files("levels")
+    start = time.perf_counter()
+    reports = [
+        analyze_file(
+            os.path.join("levels", level_name), None if args.no_cache else CACHE_DIR
+        )
+        for level_name in levels
+    ]
+
+    if args.json:
+        print(json.dumps([asdict(report) for report in reports], indent=4))
+    else:
+        for report in reports:
+            print(report.summary())
+        print(f"{len(reports)} level(s) in {time.perf_counter() - start:.2f}s")
+
+    sys.exit(0 if all(report.ok for report in reports) else 1)
@@ -0,0 +1,8 @@
+from pyglet.graphics import Group
+
+# Draw order inside a level batch, lowest first
+TERRAIN_GROUP = Group(order=0)
+PICKUP_GROUP = Group(order=1)
+ENEMY_GROUP = Group(order=2)
+PLAYER_GROUP = Group(order=3)
+PROJECTILE_GROUP = Group(order=4)
@@ -0,0 +1,183 @@
+import json
+from dataclasses import dataclass, field
+
+from pyglet.window import key
+
+REPLAY_VERSION = 1
+
+# Bit i of a recorded mask is RECORDED_KEYS[i]. New keys go at the end, files
+# list their keys by name so older recordings still decode.
+RECORDED_KEYS = (key.W, key.A, key.D, key.F)
+
+
+class TickKeys:
+    """Key state of one tick, readable like a KeyStateHandler"""
+
+    def __init__(self, mask: int, symbols: tuple[int, ...]) -> None:
+        self.mask = mask
+        self.symbols = symbols
+
+    def __getitem__(self, symbol: int) -> bool:
+        return symbol in self.symbols and bool(
+            self.mask >> self.symbols.index(symbol) & 1
+        )
+
+    @property
+    def pressed(self) -> list[int]:
+        return [
+            symbol for bit, symbol in enumerate(self.symbols) if self.mask >> bit & 1
+        ]
+
+
+def level_state(level_context) -> dict:
+    """Summary of a level compared after replaying to catch behavior drift"""
+    player = level_context.player
+    return {
+        "tick": level_context.tick,
+        "player_pos": [float(value) for value in player.pos],
+        "player_health": float(player.health),
+        "ammo_count": int(player.ammo_count),
+        "enemies_alive": int(level_context.enemy_pool.alive.sum()),
+    }
+
+
+@dataclass
+class Segment:
+    """Inputs of one level attempt, one mask per tick"""
+
+    level_name: str
+    masks: list[int] = field(default_factory=list)
+    final_state: dict = None
+
+
+@dataclass
+class Recording:
+    symbols: tuple[int, ...] = RECORDED_KEYS
+    segments: list[Segment] = field(default_factory=list)
+
+    @property
+    def level_names(self) -> list[str]:
+        return [segment.level_name for segment in self.segments]
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": REPLAY_VERSION,
+            "keys": [key.symbol_string(symbol) for symbol in self.symbols],
+            "segments": [
+                {
+                    "level": segment.level_name,
+                    "runs": encode_runs(segment.masks),
+                    "final_state": segment.final_state,
+                }
+                for segment in self.segments
+            ],
+        }
+        with open(path, "w") as out:
+            json.dump(data, out)
+
+    @staticmethod
+    def load(path: str) -> "Recording":
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data.get("version") != REPLAY_VERSION:
+            raise ValueError(f"{path} has unsupported replay version")
+
+        return Recording(
+            tuple(getattr(key, name) for name in data["keys"]),
+            [
+                Segment(
+                    segment["level"],
+                    decode_runs(segment["runs"]),
+                    segment.get("final_state"),
+                )
+                for segment in data["segments"]
+            ],
+        )
+
+
+def encode_runs(masks: list[int]) -> list[list[int]]:
+    """Run-length encodes masks as [mask, count] pairs"""
+    runs = []
+    for mask in masks:
+        if runs and runs[-1][0] == mask:
+            runs[-1][1] += 1
+        else:
+            runs.append([mask, 1])
+    return runs
+
+
+def decode_runs(runs: list[list[int]]) -> list[int]:
+    return [mask for mask, count in runs for _ in range(count)]
+
+
+class InputRecorder:
+    """Samples the live keys once per tick and records what it handed out"""
+
+    def __init__(self, symbols: tuple[int, ...] = RECORDED_KEYS) -> None:
+        self.recording = Recording(symbols)
+        self.level_context = None
+
+    def poll(self, level_context, keys) -> TickKeys:
+        if level_context is not self.level_context:
+            self.finish_segment()
+            self.level_context = level_context
+            self.recording.segments.append(Segment(level_context.level_name))
+
+        mask = 0
+        for bit, symbol in enumerate(self.recording.symbols):
+            if keys[symbol]:
+                mask |= 1 << bit
+
+        self.recording.segments[-1].masks.append(mask)
+        return TickKeys(mask, self.recording.symbols)
+
+    def finish_segment(self) -> None:
+        if self.level_context is not None:
+            self.recording.segments[-1].final_state = level_state(self.level_context)
+
+    def save(self, path: str) -> None:
+        self.finish_segment()
+        self.recording.save(path)
+
+
+class ReplayInput:
+    """Feeds recorded inputs back tick by tick, one segment per level attempt"""
+
+    def __init__(self, recording: Recording) -> None:
+        self.recording = recording
+        self.segment_index = -1
+        self.tick = 0
+        self.level_context = None
+        self.idle = TickKeys(0, recording.symbols)
+
+    @property
+    def finished(self) -> bool:
+        return self.segment_index >= len(self.recording.segments) or (
+            self.segment_index == len(self.recording.segments) - 1
+            and self.tick >= len(self.recording.segments[-1].masks)
+        )
+
+    def poll(self, level_context, keys) -> TickKeys:
+        if level_context is not self.level_context:
+            self.level_context = level_context
+            self.segment_index += 1
+            self.tick = 0
+
+            if self.segment_index < len(self.recording.segments):
+                expected = self.recording.segments[self.segment_index].level_name
+                if level_context.level_name != expected:
+                    raise ValueError(
+                        f"replay expected {expected} but {level_context.level_name} "
+                        "was loaded"
+                    )
+
+        if self.segment_index >= len(self.recording.segments):
+            return self.idle
+
+        masks = self.recording.segments[self.segment_index].masks
+        if self.tick >= len(masks):
+            return self.idle
+
+        self.tick += 1
+        return TickKeys(masks[self.tick - 1], self.recording.symbols)
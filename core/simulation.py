@@ -0,0 +1,175 @@
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import pyglet
+
+# Headless runs have no display, so pyglet must not open its shadow window
+# when the GL module gets imported by the rendering code below.
+pyglet.options["shadow_window"] = False
+
+from pyglet.window import key  # noqa: E402
+
+from core.level_context import LevelContext  # noqa: E402
+from core.level_loader import LevelData, read_level_data  # noqa: E402
+from core.replay import Recording, TickKeys, level_state  # noqa: E402
+from enums.game_state import GameState  # noqa: E402
+
+InputScript = Callable[[int], Iterable[int]]
+
+
+class ScriptedKeys:
+    """Stand-in for key.KeyStateHandler backed by a set of pressed keys"""
+
+    def __init__(self, pressed: Iterable[int] = ()) -> None:
+        self.pressed = set(pressed)
+
+    def __getitem__(self, symbol: int) -> bool:
+        return symbol in self.pressed
+
+
+class HeadlessGameContext:
+    """The parts of GameContext a LevelContext talks to, without any menus"""
+
+    def __init__(self) -> None:
+        self.game_state = GameState.IN_GAME
+        self.reached_end = False
+
+    def next_level(self) -> None:
+        self.reached_end = True
+        self.game_state = GameState.WIN
+
+
+@dataclass
+class SimulationResult:
+    level_name: str
+    outcome: str
+    ticks: int
+    elapsed: float
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+class Simulation:
+    """Steps a level without a window, GL context or any rendering objects"""
+
+    def __init__(self, level_name: str, data: LevelData = None) -> None:
+        self.level_name = level_name
+        self.game_context = HeadlessGameContext()
+        if data is None:
+            data = read_level_data(level_name)
+        self.level_context = LevelContext.from_data(
+            data, None, self.game_context, headless=True
+        )
+        self.keys = ScriptedKeys()
+
+    @property
+    def running(self) -> bool:
+        return self.game_context.game_state == GameState.IN_GAME
+
+    @property
+    def outcome(self) -> str:
+        match self.game_context.game_state:
+            case GameState.WIN:
+                return "portal"
+            case GameState.GAME_OVER:
+                return "died"
+        return "timeout"
+
+    def step(self, pressed: Iterable[int] = ()) -> bool:
+        """Runs one tick with the given keys held, returns False once over"""
+        if not self.running:
+            return False
+
+        self.keys.pressed = set(pressed)
+        self.level_context.update(self.keys)
+        return self.running
+
+    def run(self, script: InputScript, max_ticks: int) -> SimulationResult:
+        start = time.perf_counter()
+        ticks = 0
+
+        while ticks < max_ticks and self.running:
+            self.step(script(self.level_context.tick))
+            ticks += 1
+
+        return SimulationResult(
+            self.level_name, self.outcome, ticks, time.perf_counter() - start
+        )
+
+
+def hold(*symbols: int) -> InputScript:
+    """Input script that keeps the same keys pressed every tick"""
+    pressed = frozenset(symbols)
+    return lambda tick: pressed
+
+
+def parse_keys(names: str) -> list[int]:
+    return [getattr(key, name.upper()) for name in names if name.strip()]
+
+
+def recorded(masks: list[int], symbols: tuple[int, ...]) -> InputScript:
+    """Input script playing back recorded masks, nothing pressed afterwards"""
+    pressed = {mask: TickKeys(mask, symbols).pressed for mask in set(masks)}
+    return lambda tick: pressed[masks[tick]] if tick < len(masks) else ()
+
+
+@dataclass
+class ReplayResult:
+    result: SimulationResult
+    state: dict
+    expected: dict
+
+    @property
+    def drifted(self) -> bool:
+        return self.expected is not None and self.state != self.expected
+
+
+def replay(recording: Recording) -> list[ReplayResult]:
+    """Replays every segment of a recording as fast as possible"""
+    results = []
+    for segment in recording.segments:
+        simulation = Simulation(segment.level_name)
+        result = simulation.run(
+            recorded(segment.masks, recording.symbols), len(segment.masks)
+        )
+        results.append(
+            ReplayResult(
+                result, level_state(simulation.level_context), segment.final_state
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a level without a window")
+    parser.add_argument("level", nargs="?", help="level file name inside levels/")
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--hold", default="", help="keys held every tick, e.g. DW")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded session")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        replays = replay(Recording.load(args.replay))
+        for replayed in replays:
+            result = replayed.result
+            print(
+                f"{result.level_name}: {result.outcome} after {result.ticks} ticks "
+                f"({result.ticks_per_second:.0f} ticks/s)"
+                + (" DRIFTED" if replayed.drifted else "")
+            )
+            if replayed.drifted:
+                print(f"  expected {replayed.expected}\n  got      {replayed.state}")
+        raise SystemExit(1 if any(replayed.drifted for replayed in replays) else 0)
+
+    if args.level is None:
+        parser.error("a level or --replay is required")
+
+    result = Simulation(args.level).run(hold(*parse_keys(args.hold)), args.ticks)
+    print(
+        f"{result.level_name}: {result.outcome} after {result.ticks} ticks "
+        f"({result.ticks_per_second:.0f} ticks/s)"
+    )
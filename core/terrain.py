@@ -0,0 +1,128 @@
+from collections.abc import Iterator
+
+from pyglet import shapes
+from pyglet.gl import GL_TRIANGLES
+from pyglet.graphics import Batch, ShaderGroup
+
+from core.level_geometry import LevelGeometry
+from core.render_groups import TERRAIN_GROUP
+from core.tile_map import TileMap
+from objects.block import Block
+
+WHITE = (255, 255, 255, 255)
+
+# Chunks inside the stream rect are built before the tick that needs them,
+# chunks in the prefetch ring are built a few per tick and chunks beyond
+# the release ring are dropped again.
+PREFETCH_CHUNKS = 1
+RELEASE_CHUNKS = 2
+PREFETCH_BUDGET = 2
+
+
+class TerrainChunk:
+    def __init__(self, key: tuple[int, int], geometry: LevelGeometry) -> None:
+        self.key = key
+        self.blocks = [
+            Block(x, y, width, height, color=WHITE[:3])
+            for x, y, width, height in geometry.chunks[key].tolist()
+        ]
+        self.batch: Batch = None
+        self.vertex_list = None
+
+    def build_mesh(self, geometry: LevelGeometry, program) -> None:
+        positions, indices = geometry.chunk_vertices(self.key)
+        count = len(positions) // 2
+
+        self.batch = Batch()
+        self.vertex_list = program.vertex_list_indexed(
+            count,
+            GL_TRIANGLES,
+            indices.tolist(),
+            self.batch,
+            ShaderGroup(program, parent=TERRAIN_GROUP),
+            position=("f", positions.tolist()),
+            colors=("Bn", WHITE * count),
+            translation=("f", (0, 0) * count),
+        )
+
+    def release(self, tile_map: TileMap) -> None:
+        for block in self.blocks:
+            tile_map.remove(block)
+
+        if self.vertex_list is not None:
+            self.vertex_list.delete()
+            self.vertex_list = None
+
+
+class Terrain:
+    """Streams terrain chunks in and out around a focus rect.
+
+    Each loaded chunk registers its blocks in the level's tile map for
+    collision and, unless headless, owns one vertex list for drawing.
+    """
+
+    def __init__(
+        self, geometry: LevelGeometry, tile_map: TileMap, headless: bool = False
+    ) -> None:
+        self.geometry = geometry
+        self.tile_map = tile_map
+        self.headless = headless
+        self.program = None if headless else shapes.get_default_shader()
+        self.chunks: dict[tuple[int, int], TerrainChunk] = {}
+
+    def load_chunk(self, key: tuple[int, int]) -> None:
+        chunk = TerrainChunk(key, self.geometry)
+        for block in chunk.blocks:
+            self.tile_map.add(block)
+
+        if not self.headless:
+            chunk.build_mesh(self.geometry, self.program)
+
+        self.chunks[key] = chunk
+
+    def load_steps(self, focus: tuple[float, float, float, float]) -> Iterator[None]:
+        """Loads the chunks `update` would want around `focus`, yielding after
+        each one so a level can be built over several frames"""
+        x0, y0, x1, y1 = focus
+        margin = PREFETCH_CHUNKS * self.geometry.chunk_size
+        for key in self.geometry.chunk_keys_in_rect(
+            x0 - margin, y0 - margin, x1 + margin, y1 + margin
+        ):
+            if key not in self.chunks:
+                self.load_chunk(key)
+                yield
+
+    def update(self, focus: tuple[float, float, float, float]) -> None:
+        """Loads every chunk touching `focus` and some around it"""
+        x0, y0, x1, y1 = focus
+        size = self.geometry.chunk_size
+
+        for key in self.geometry.chunk_keys_in_rect(x0, y0, x1, y1):
+            if key not in self.chunks:
+                self.load_chunk(key)
+
+        margin = PREFETCH_CHUNKS * size
+        budget = PREFETCH_BUDGET
+        for key in self.geometry.chunk_keys_in_rect(
+            x0 - margin, y0 - margin, x1 + margin, y1 + margin
+        ):
+            if budget == 0:
+                break
+            if key not in self.chunks:
+                self.load_chunk(key)
+                budget -= 1
+
+        margin = RELEASE_CHUNKS * size
+        keep = set(
+            self.geometry.chunk_keys_in_rect(
+                x0 - margin, y0 - margin, x1 + margin, y1 + margin
+            )
+        )
+        for key in [key for key in self.chunks if key not in keep]:
+            self.chunks.pop(key).release(self.tile_map)
+
+    def draw(self, viewport: tuple[float, float, float, float]) -> None:
+        for key in self.geometry.chunk_keys_in_rect(*viewport):
+            chunk = self.chunks.get(key)
+            if chunk is not None and chunk.batch is not None:
+                chunk.batch.draw()
@@ -0,0 +1,65 @@
+import math
+
+from core.body import Body
+
+
+class TileMap:
+    """Sparse grid index of static bodies, keyed by (column, row) cell."""
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[Body]] = {}
+
+    def cell_range(self, x0, y0, x1, y1) -> tuple[int, int, int, int]:
+        """Cells touched by the closed rect [x0, x1] x [y0, y1], edges included"""
+        return (
+            math.ceil(x0 / self.cell_size) - 1,
+            math.ceil(y0 / self.cell_size) - 1,
+            math.floor(x1 / self.cell_size),
+            math.floor(y1 / self.cell_size),
+        )
+
+    def body_cells(self, body: Body):
+        cx0 = math.floor(body.pos[0] / self.cell_size)
+        cy0 = math.floor(body.pos[1] / self.cell_size)
+        cx1 = math.ceil((body.pos[0] + body.hitbox[0]) / self.cell_size)
+        cy1 = math.ceil((body.pos[1] + body.hitbox[1]) / self.cell_size)
+
+        for cx in range(cx0, max(cx1, cx0 + 1)):
+            for cy in range(cy0, max(cy1, cy0 + 1)):
+                yield cx, cy
+
+    def add(self, body: Body) -> None:
+        for cell in self.body_cells(body):
+            self.cells.setdefault(cell, []).append(body)
+
+    def remove(self, body: Body) -> None:
+        for cell in self.body_cells(body):
+            bodies = self.cells.get(cell)
+            if bodies is None or body not in bodies:
+                continue
+
+            bodies.remove(body)
+            if len(bodies) == 0:
+                del self.cells[cell]
+
+    def query_rect(self, x0, y0, x1, y1) -> list[Body]:
+        """Bodies that may touch the rect, each returned once"""
+        cx0, cy0, cx1, cy1 = self.cell_range(x0, y0, x1, y1)
+        found: dict[int, Body] = {}
+
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bodies = self.cells.get((cx, cy))
+                if bodies is None:
+                    continue
+                for body in bodies:
+                    found[id(body)] = body
+
+        return list(found.values())
+
+    def query_point(self, x, y) -> list[Body]:
+        return self.query_rect(x, y, x, y)
+
+    def __len__(self) -> int:
+        return len(self.cells)
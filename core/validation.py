@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from multiprocessing import Pool
+
+from core.simulation import Simulation, hold, parse_keys, recorded
+from core.level_cache import LevelCache
+from core.level_file import level_files
+from core.replay import Recording, level_state
+
+DEFAULT_TICKS = 3600
+
+# Held-key scripts every level is run against, by name
+DEFAULT_SCRIPTS = {
+    "idle": "",
+    "right": "D",
+    "right_jump": "DW",
+    "right_shoot": "DF",
+    "left_jump": "AW",
+}
+
+
+@dataclass
+class Job:
+    level_name: str
+    script: str
+    max_ticks: int
+    # Keys held every tick, or recorded masks when this replays a recording
+    hold: str = ""
+    masks: list[int] = None
+    symbols: tuple[int, ...] = None
+    expected: dict = None
+
+
+@dataclass
+class JobResult:
+    level_name: str
+    script: str
+    outcome: str
+    ticks: int
+    elapsed: float
+    ticks_per_second: float
+    state: dict = None
+    drifted: bool = False
+    error: str = None
+
+
+# One per worker process, so the scripts of a level share its decoded data
+_level_cache = LevelCache()
+
+
+def run_job(job: Job) -> JobResult:
+    """Runs one level with one input script headless, errors are reported"""
+    try:
+        simulation = Simulation(job.level_name, _level_cache.get(job.level_name))
+        if job.masks is None:
+            script = hold(*parse_keys(job.hold))
+        else:
+            script = recorded(job.masks, job.symbols)
+        result = simulation.run(script, job.max_ticks)
+    except Exception as error:
+        return JobResult(
+            job.level_name, job.script, "error", 0, 0.0, 0.0, error=repr(error)
+        )
+
+    state = level_state(simulation.level_context)
+    return JobResult(
+        job.level_name,
+        job.script,
+        result.outcome,
+        result.ticks,
+        result.elapsed,
+        result.ticks_per_second,
+        state,
+        job.expected is not None and state != job.expected,
+    )
+
+
+def collect_jobs(
+    levels: list[str],
+    scripts: dict[str, str],
+    recordings: list[str],
+    max_ticks: int,
+) -> list[Job]:
+    jobs = [
+        Job(level_name, name, max_ticks, hold=keys)
+        for level_name in levels
+        for name, keys in scripts.items()
+    ]
+
+    for path in recordings:
+        recording = Recording.load(path)
+        for index, segment in enumerate(recording.segments):
+            jobs.append(
+                Job(
+                    segment.level_name,
+                    f"{os.path.basename(path)}#{index}",
+                    len(segment.masks),
+                    masks=segment.masks,
+                    symbols=recording.symbols,
+                    expected=segment.final_state,
+                )
+            )
+    return jobs
+
+
+def run_jobs(jobs: list[Job], processes: int = None) -> list[JobResult]:
+    """Spreads the jobs over a process pool, one worker per core by default"""
+    with Pool(processes) as pool:
+        results = list(pool.imap_unordered(run_job, jobs))
+    return sorted(results, key=lambda result: (result.level_name, result.script))
+
+
+def summarize(results: list[JobResult], elapsed: float, processes: int) -> dict:
+    levels: dict[str, dict[str, int]] = {}
+    for result in results:
+        outcomes = levels.setdefault(result.level_name, {})
+        outcomes[result.outcome] = outcomes.get(result.outcome, 0) + 1
+
+    simulated = sum(result.elapsed for result in results)
+    ticks = sum(result.ticks for result in results)
+    return {
+        "jobs": len(results),
+        "processes": processes,
+        "wall_seconds": elapsed,
+        "simulated_seconds": simulated,
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else None,
+        "errors": sum(result.outcome == "error" for result in results),
+        "drifted": sum(result.drifted for result in results),
+        "levels": levels,
+        "unfinished_levels": [
+            level_name
+            for level_name, outcomes in levels.items()
+            if "portal" not in outcomes
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run every level against input scripts and replays in parallel"
+    )
+    parser.add_argument(
+        "levels", nargs="*", help="level file names inside levels/, default all"
+    )
+    parser.add_argument(
+        "--hold",
+        action="append",
+        metavar="KEYS",
+        help="extra script holding these keys, e.g. DW; may be repeated",
+    )
+    parser.add_argument(
+        "--replay",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="recorded session to replay and check for drift; may be repeated",
+    )
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS)
+    parser.add_argument(
+        "--processes", type=int, default=os.cpu_count(), help="default: all cores"
+    )
+    parser.add_argument(
+        "--require-portal",
+        action="store_true",
+        help="fail when a level is not finished by any script",
+    )
+    parser.add_argument("--out", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    levels = args.levels or level_files("levels")
+    scripts = dict(DEFAULT_SCRIPTS)
+    for keys in args.hold or []:
+        scripts[f"hold_{keys}"] = keys
+
+    jobs = collect_jobs(levels, scripts, args.replay, args.ticks)
+    start = time.perf_counter()
+    results = run_jobs(jobs, args.processes)
+    summary = summarize(results, time.perf_counter() - start, args.processes)
+
+    report = {"summary": summary, "results": [asdict(result) for result in results]}
+    if args.out is None:
+        print(json.dumps(report, indent=4))
+    else:
+        with open(args.out, "w") as out:
+            json.dump(report, out, indent=4)
+
+    failed = summary["errors"] or summary["drifted"]
+    if args.require_portal and summary["unfinished_levels"]:
+        failed = True
+    sys.exit(1 if failed else 0)
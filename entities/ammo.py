@@ -1,9 +1,12 @@
 from core.entity import Entity, EntityMode, SpriteConfig
+from core.render_groups import PICKUP_GROUP
 
 AMMO_WIDTH = 30
 
 
 class Ammo(Entity):
+    render_group = PICKUP_GROUP
+
     def __init__(
         self,
         x,
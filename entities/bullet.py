@@ -1,5 +1,7 @@
-import time
+import numpy as np
+
 from core.entity import Entity, EntityMode, SpriteConfig
+from core.render_groups import PROJECTILE_GROUP
 
 
 BULLET_WIDTH = 10
@@ -7,6 +9,8 @@ BULLET_HEIGHT = 10
 
 
 class Bullet(Entity):
+    render_group = PROJECTILE_GROUP
+
     def __init__(
         self,
         x,
@@ -18,7 +22,7 @@ class Bullet(Entity):
     ):
         super().__init__(x, y, BULLET_WIDTH, BULLET_HEIGHT, level_context, 0)
         self.direction = direction
-        self.lifetime = time.time() + lifetime
+        self.lifetime = level_context.time + lifetime
         bullets.append(self)
 
         self.current_mode = EntityMode.WALKING
@@ -38,5 +42,5 @@ class Bullet(Entity):
         )
 
     def update(self):
-        self.vel = self.direction * self.speed
+        np.multiply(self.direction, self.speed, out=self.vel)
         self.pos += self.vel
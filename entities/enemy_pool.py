@@ -0,0 +1,242 @@
+import numpy as np
+
+from core.entity import GRAVITY, JUMP_ACC, EntityMode
+from core.direction import Direction
+from core.navigation import FlowField, Link
+from entities.enemy import (
+    ATTACK_TIMEOUT,
+    ENEMY_HEALTH,
+    ENEMY_HEIGHT,
+    ENEMY_SPEED,
+    ENEMY_WIDTH,
+    MODE_CODES,
+    Enemy,
+)
+
+WAKE_DISTANCE = 1000
+CHASE_DISTANCE = 500
+ATTACK_DISTANCE = 50
+ATTACK_DAMAGE = 50
+
+# Enemies within NEAR_DISTANCE or in the air update every tick, grounded ones
+# further out only every MID_UPDATE_INTERVAL ticks. From there they can't
+# chase or attack and just stand, so skipping ticks loses next to nothing.
+NEAR_DISTANCE = CHASE_DISTANCE + 100
+MID_UPDATE_INTERVAL = 4
+BUCKET_SIZE = 500
+
+# Paths may detour, so the shared flow field reaches past the chase range
+FLOW_RADIUS = 2 * CHASE_DISTANCE
+
+
+class EnemyPool:
+    """Enemy state kept in contiguous arrays and updated in one pass.
+
+    Every `Enemy` is a thin handle whose `pos`, `vel` and `center` are row
+    views into these arrays, so the per-enemy collision code in `Entity`
+    keeps working on the shared state.
+
+    Living enemies are also kept in coarse spatial buckets. Only the
+    buckets around the player are visited, so enemies beyond
+    WAKE_DISTANCE cost nothing per tick. Grounded chasers follow one flow
+    field toward the player's cell instead of walking straight at them.
+    """
+
+    def __init__(self, positions, level_context, lazy: bool = False) -> None:
+        count = len(positions)
+        self.level_context = level_context
+
+        self.pos = np.array(positions, dtype=float).reshape(count, 2)
+        self.prev_pos = self.pos.copy()
+        self.vel = np.zeros((count, 2))
+        self.acc = np.zeros((count, 2))
+        self.hitbox = np.array([ENEMY_WIDTH, ENEMY_HEIGHT], dtype=float)
+        self.half_hitbox = self.hitbox / 2
+        self.center = self.pos + self.half_hitbox
+        self.direction = np.tile(Direction.RIGHT.get().astype(float), (count, 1))
+
+        self.health = np.full(count, ENEMY_HEALTH, dtype=float)
+        self.modes = np.full(count, MODE_CODES[EntityMode.IDLE], dtype=np.int8)
+        self.grounded = np.zeros(count, dtype=bool)
+        self.chasing = np.zeros(count, dtype=bool)
+        self.started_attack = np.zeros(count, dtype=bool)
+        self.attack_active = np.zeros(count, dtype=bool)
+        self.attack_until = np.zeros(count)
+        self.alive = np.ones(count, dtype=bool)
+
+        self.bucket_keys = np.floor_divide(self.pos, BUCKET_SIZE).astype(int)
+        self.buckets: dict[tuple[int, int], set[int]] = {}
+        for i, (bx, by) in enumerate(self.bucket_keys.tolist()):
+            self.buckets.setdefault((bx, by), set()).add(i)
+
+        self.flow: FlowField = None
+        self.members: list[Enemy] = []
+        if not lazy:
+            self.create_members(count)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def create_members(self, count: int) -> bool:
+        """Creates up to `count` more Enemy handles, True while some are missing"""
+        start = len(self.members)
+        stop = min(start + count, len(self.pos))
+        self.members.extend(
+            Enemy(self, i, self.level_context) for i in range(start, stop)
+        )
+        return len(self.members) < len(self.pos)
+
+    def boxes(self) -> np.ndarray:
+        """(N, 4) array of x, y, w, h for every slot, dead ones included"""
+        boxes = np.empty((len(self.pos), 4))
+        boxes[:, :2] = self.pos
+        boxes[:, 2:] = self.hitbox
+        return boxes
+
+    def kill(self, index: int) -> None:
+        self.alive[index] = False
+        self.buckets[tuple(self.bucket_keys[index].tolist())].discard(index)
+
+    def nearby(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Sorted indices of living enemies in the buckets touching the square"""
+        bx0, by0 = int((x - radius) // BUCKET_SIZE), int((y - radius) // BUCKET_SIZE)
+        bx1, by1 = int((x + radius) // BUCKET_SIZE), int((y + radius) // BUCKET_SIZE)
+
+        indices = []
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                bucket = self.buckets.get((bx, by))
+                if bucket:
+                    indices.extend(bucket)
+        return np.sort(np.array(indices, dtype=int))
+
+    def rebucket(self, indices: np.ndarray) -> None:
+        """Moves the given enemies to the bucket of their current position"""
+        keys = np.floor_divide(self.pos[indices], BUCKET_SIZE).astype(int)
+        moved = np.flatnonzero(np.any(keys != self.bucket_keys[indices], axis=1))
+        for j in moved:
+            i = indices[j]
+            self.buckets[tuple(self.bucket_keys[i].tolist())].discard(i)
+            self.buckets.setdefault(tuple(keys[j].tolist()), set()).add(i)
+            self.bucket_keys[i] = keys[j]
+
+    def store_state(self) -> None:
+        self.prev_pos[:] = self.pos
+
+    def steer(
+        self, active: np.ndarray, candidates: np.ndarray, target_x: np.ndarray
+    ) -> np.ndarray:
+        """Points `target_x` of the `candidates` rows along the flow field.
+
+        Rows are into `active`. Returns a mask of rows whose next move is a
+        jump. Enemies without a path keep heading straight for the player.
+        """
+        jump = np.zeros(len(active), dtype=bool)
+        graph = self.level_context.navigation
+        if graph is None or len(candidates) == 0:
+            return jump
+
+        if self.flow is None:
+            self.flow = FlowField(graph, FLOW_RADIUS // graph.cell_size)
+        player = self.level_context.player
+        self.flow.update(player.center[0], player.pos[1] + graph.cell_size / 2)
+
+        for j in candidates:
+            i = active[j]
+            x = self.center[i, 0]
+            node = graph.node_below(x, self.pos[i, 1] + graph.cell_size / 2)
+            move = None if node is None else self.flow.move(node)
+            if move is None:
+                continue
+
+            (next_x, _), link = move
+            target_x[j] = (next_x + 0.5) * graph.cell_size - x
+            jump[j] = link is Link.JUMP
+        return jump
+
+    def update(self) -> None:
+        if len(self.pos) == 0:
+            return
+
+        player = self.level_context.player
+        now = self.level_context.time
+        tick = self.level_context.tick
+
+        # Buckets hold corner positions, so reach one hitbox further out
+        candidates = self.nearby(*player.center, WAKE_DISTANCE + ENEMY_HEIGHT)
+        if len(candidates) == 0:
+            return
+
+        self.center[candidates] = self.pos[candidates] + self.half_hitbox
+        dist = np.linalg.norm(player.center - self.center[candidates], axis=1)
+        awake = dist <= WAKE_DISTANCE
+        due = (
+            (dist <= NEAR_DISTANCE)
+            | ~self.grounded[candidates]
+            | ((candidates + tick) % MID_UPDATE_INTERVAL == 0)
+        )
+        active = candidates[awake & due]
+        if len(active) == 0:
+            return
+
+        dist = dist[awake & due]
+        pos = self.pos[active]
+        vel = self.vel[active]
+
+        # Ground check, mode and gravity
+        for i in active:
+            enemy = self.members[i]
+            enemy.grounded_check(enemy.nearby_blocks())
+            self.grounded[i] = enemy.grounded
+        grounded = self.grounded[active]
+
+        modes = np.where(
+            grounded,
+            np.where(
+                vel[:, 0] != 0,
+                MODE_CODES[EntityMode.WALKING],
+                MODE_CODES[EntityMode.IDLE],
+            ),
+            MODE_CODES[EntityMode.JUMPING],
+        )
+        acc = np.where(grounded[:, None], 0, GRAVITY)
+
+        # Targeting and horizontal movement
+        chasing = (ATTACK_DISTANCE < dist) & (dist < CHASE_DISTANCE)
+        attacking = dist < ATTACK_DISTANCE
+        modes[attacking] = MODE_CODES[EntityMode.ATTACKING]
+        self.started_attack[active] = attacking
+        self.chasing[active] = chasing
+
+        target_x = player.center[0] - pos[:, 0]
+        jump = self.steer(active, np.flatnonzero(chasing & grounded), target_x)
+        vel[:, 0] = np.where(chasing, np.sign(target_x) * ENEMY_SPEED, 0)
+        self.vel[active] = vel
+        self.modes[active] = modes
+
+        for i in active:
+            self.members[i].handle_collisions(self.members[i].nearby_blocks())
+        vel = self.vel[active]
+
+        acc[chasing & grounded & ((vel[:, 0] == 0) | jump)] += JUMP_ACC
+
+        self.direction[active, 0] = np.where(target_x > 0, 1, -1)
+
+        # Attacks
+        expired = now > self.attack_until[active]
+        self.attack_active[active[expired]] = False
+        self.attack_until[active[expired]] = 0
+
+        hits = active[
+            (modes == MODE_CODES[EntityMode.ATTACKING]) & ~self.attack_active[active]
+        ]
+        player.health -= ATTACK_DAMAGE * len(hits)
+        self.attack_active[hits] = True
+        self.attack_until[hits] = now + ATTACK_TIMEOUT
+
+        # Integration
+        vel += acc
+        self.acc[active] = acc
+        self.vel[active] = vel
+        self.pos[active] += vel
+        self.rebucket(active)
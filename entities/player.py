@@ -1,8 +1,8 @@
-import time
 from pyglet.window import key
 from core.direction import Direction
 from entities.bullet import Bullet
 from core.entity import JUMP_ACC, Entity, EntityMode, SpriteConfig
+from core.render_groups import PLAYER_GROUP
 from enums.game_state import GameState
 
 PLAYER_WIDTH = 75
@@ -12,6 +12,8 @@ BULLET_TIMEOUT = 1
 
 
 class Player(Entity):
+    render_group = PLAYER_GROUP
+
     def __init__(self, pos: tuple[int, int], level_context) -> None:
         super().__init__(
             pos[0], pos[1], PLAYER_WIDTH, PLAYER_HEIGHT, level_context, 100
@@ -57,13 +59,13 @@ class Player(Entity):
         if self.pos[1] < -1000:
             self.health -= 1
 
-        self.center = self.pos + self.hitbox / 2
+        self.update_center()
 
         self.handle_ground()
 
         self.handle_shooting(keys, self.level_context.bullets)
         self.handle_movement(keys)
-        self.handle_collisions(self.level_context.blocks)
+        self.handle_collisions(self.nearby_blocks())
 
         self.vel += self.acc
         self.pos += self.vel
@@ -74,7 +76,7 @@ class Player(Entity):
         if self.ammo_count == 0:
             return
 
-        if time.time() > self.bullet_timeout[1]:
+        if self.level_context.time > self.bullet_timeout[1]:
             self.bullet_timeout = (False, 0)
 
         if keys[key.F]:
@@ -86,7 +88,10 @@ class Player(Entity):
                     bullets,
                     self.level_context,
                 )
-                self.bullet_timeout = (True, time.time() + BULLET_TIMEOUT)
+                self.bullet_timeout = (
+                    True,
+                    self.level_context.time + BULLET_TIMEOUT,
+                )
                 self.ammo_count -= 1
 
     def handle_movement(self, keys):
@@ -95,10 +100,10 @@ class Player(Entity):
                 self.acc += JUMP_ACC
 
         if keys[key.D]:
-            self.vel[0] = (Direction.RIGHT.get() * self.speed)[0]
+            self.vel[0] = Direction.RIGHT.value[0] * self.speed
             self.direction = Direction.RIGHT.get()
         elif keys[key.A]:
-            self.vel[0] = (Direction.LEFT.get() * self.speed)[0]
+            self.vel[0] = Direction.LEFT.value[0] * self.speed
             self.direction = Direction.LEFT.get()
 
         else:
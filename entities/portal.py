@@ -1,10 +1,13 @@
 from core.entity import Entity, EntityMode, SpriteConfig
+from core.render_groups import PICKUP_GROUP
 
 PORTAL_WIDTH = 70
 PORTAL_HEIGHT = 120
 
 
 class Portal(Entity):
+    render_group = PICKUP_GROUP
+
     def __init__(
         self,
         x,
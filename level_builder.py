@@ -1,16 +1,29 @@
 from dataclasses import dataclass
+from collections import deque
 from enum import Enum
-import json
 import os
+import re
+import sys
+import threading
 import time
 import numpy as np
-from pyglet import app, shapes, text
+from pyglet import app, clock, shapes, text
 from pyglet.math import Mat4
 from pyglet.window import key, Window, mouse
-from pyglet.graphics import Batch
+from pyglet.graphics import Batch, Group
 
-from core.level import Level, LevelDecoder, LevelEncoder
+from core.level import Level
+from core.level_file import load_level_file, save_level_file, to_coords
+from core.level_journal import JournalEntry, LevelJournal, journal_path, read_journal
+from core.level_geometry import CHUNK_TILES, merge_cells
+from core.reachability import analyze_file
 
+SAVE_DEBOUNCE = 0.25
+# The journal is folded into the level file once it is this large next to
+# the file, and at least COMPACT_MIN_BYTES, so saves stay rare on big levels
+COMPACT_RATIO = 0.5
+COMPACT_MIN_BYTES = 256 * 1024
+LEVEL_NAME = re.compile(r"level_(\d+)\.(?:json|lvl)")
 
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
@@ -31,38 +44,76 @@ bg = shapes.Rectangle(0, 0, win.width, win.height, BG_COLOR)
 origin = shapes.Circle(0, 0, 5, color=WHITE)
 camera_pos = [0, 0]
 
-# Generate grid
-grid = []
 grid_batch = Batch()
 GRID_GAP = 30
-NUM_OF_LINES = 1000
 
 block_batch = Batch()
 enemy_batch = Batch()
 ammo_batch = Batch()
 
-for i in range(-NUM_OF_LINES // 2, NUM_OF_LINES // 2):
-    grid.append(
-        shapes.Line(
-            -NUM_OF_LINES // 2 * GRID_GAP,
-            i * GRID_GAP,
-            NUM_OF_LINES // 2 * GRID_GAP,
-            i * GRID_GAP,
-            color=GRID_COLOR,
-            batch=grid_batch,
-        )
-    )
 
-    grid.append(
-        shapes.Line(
-            i * GRID_GAP,
-            -NUM_OF_LINES // 2 * GRID_GAP,
-            i * GRID_GAP,
-            NUM_OF_LINES // 2 * GRID_GAP,
-            color=GRID_COLOR,
-            batch=grid_batch,
-        )
-    )
+class ViewportGrid(Group):
+    """Grid lines covering just the window.
+
+    The lines are laid out once per window size and shifted to the camera,
+    snapped to whole cells, while the group is drawn.
+    """
+
+    def __init__(self, window: Window, batch: Batch, gap: int, color) -> None:
+        super().__init__()
+        self.window = window
+        self.batch = batch
+        self.gap = gap
+        self.color = color
+        self.lines: list[shapes.Line] = []
+        self.size: tuple[int, int] = None
+        self.offset = (0, 0)
+        self.previous_view: Mat4 = None
+
+    def update(self, x: int, y: int, width: int, height: int) -> None:
+        self.offset = (x - x % self.gap, y - y % self.gap)
+        if (width, height) == self.size:
+            return
+        self.size = (width, height)
+
+        for line in self.lines:
+            line.delete()
+
+        columns = width // self.gap + 2
+        rows = height // self.gap + 2
+        self.lines = [
+            shapes.Line(
+                i * self.gap,
+                0,
+                i * self.gap,
+                rows * self.gap,
+                color=self.color,
+                batch=self.batch,
+                group=self,
+            )
+            for i in range(columns + 1)
+        ] + [
+            shapes.Line(
+                0,
+                i * self.gap,
+                columns * self.gap,
+                i * self.gap,
+                color=self.color,
+                batch=self.batch,
+                group=self,
+            )
+            for i in range(rows + 1)
+        ]
+
+    def set_state(self) -> None:
+        self.previous_view = self.window.view
+        self.window.view = self.previous_view @ Mat4().translate((*self.offset, 0))
+
+    def unset_state(self) -> None:
+        self.window.view = self.previous_view
+
+
+grid = ViewportGrid(win, grid_batch, GRID_GAP, GRID_COLOR)
 
 
 class Placable(Enum):
@@ -94,6 +145,62 @@ class Placable(Enum):
                 )
 
 
+class BlockMesh:
+    """Draws placed blocks as merged rectangles, rebuilt per changed chunk"""
+
+    def __init__(self, batch: Batch) -> None:
+        self.batch = batch
+        self.chunk_size = GRID_GAP * CHUNK_TILES
+        self.cells: dict[tuple[int, int], set[tuple[int, int]]] = {}
+        self.rects: dict[tuple[int, int], list[shapes.Rectangle]] = {}
+        self.dirty: set[tuple[int, int]] = set()
+
+    def chunk_key(self, pos) -> tuple[int, int]:
+        return (pos[0] // self.chunk_size, pos[1] // self.chunk_size)
+
+    def add(self, pos) -> None:
+        key = self.chunk_key(pos)
+        self.cells.setdefault(key, set()).add((pos[0], pos[1]))
+        self.dirty.add(key)
+
+    def remove(self, pos) -> None:
+        key = self.chunk_key(pos)
+        self.cells.get(key, set()).discard((pos[0], pos[1]))
+        self.dirty.add(key)
+
+    def update(self, cells, present: bool) -> None:
+        """Adds or removes many cells, each chunk touched is rebuilt once"""
+        by_chunk: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for pos in cells:
+            by_chunk.setdefault(self.chunk_key(pos), []).append((pos[0], pos[1]))
+
+        for key, chunk_cells in by_chunk.items():
+            if present:
+                self.cells.setdefault(key, set()).update(chunk_cells)
+            else:
+                self.cells.get(key, set()).difference_update(chunk_cells)
+            self.dirty.add(key)
+
+    def refresh(self) -> None:
+        for key in self.dirty:
+            cells = self.cells.get(key)
+            if not cells:
+                self.cells.pop(key, None)
+                self.rects.pop(key, None)
+                continue
+
+            self.rects[key] = [
+                shapes.Rectangle(
+                    x=x, y=y, width=width, height=height, color=WHITE, batch=self.batch
+                )
+                for x, y, width, height in merge_cells(list(cells), GRID_GAP).tolist()
+            ]
+        self.dirty.clear()
+
+
+block_mesh = BlockMesh(block_batch)
+
+
 @dataclass
 class LevelBuild:
     blocks: dict[np.array : Placable.BLOCK]
@@ -102,64 +209,182 @@ class LevelBuild:
     ammo: dict[np.array : Placable.AMMO]
     level_end: np.array
 
-    def save(self) -> None:
-        levels = os.listdir("levels")
-
-        if len(levels) == 0:
-            filename = "level_1.json"
-        else:
-            filename = f"level_{max([int(x.split('.')[0].split('_')[1]) for x in levels]) + 1}.json"
+    level_name: str = None
 
+    def snapshot(self) -> Level:
+        """Copy of the placed items that a save can encode off the render thread"""
         level = Level()
 
         if self.blocks is not None:
-            level.blocks = [(key[0], key[1]) for key in self.blocks.keys()]
+            level.blocks = list(self.blocks.keys())
 
         if self.enemies is not None:
-            level.enemies = [(key[0], key[1]) for key in self.enemies.keys()]
+            level.enemies = list(self.enemies.keys())
 
         if self.player_spawn is not None:
             level.player_spawn = (self.player_spawn[0], self.player_spawn[1])
 
         if self.ammo is not None:
-            level.ammo = [(key[0], key[1]) for key in self.ammo.keys()]
+            level.ammo = list(self.ammo.keys())
 
         if self.level_end is not None:
             level.level_end = (self.level_end[0], self.level_end[1])
 
-        with open(os.path.join("levels", filename), "w") as out:
-            out.write(json.dumps(level, cls=LevelEncoder, indent=4))
+        return level
 
     def load(self, level_name: str) -> None:
-        with open(os.path.join("levels", level_name), "r") as f:
-            loaded_level: Level = json.load(f, cls=LevelDecoder)
+        loaded_level = load_level_file(os.path.join("levels", level_name))
 
-            for block_pos in loaded_level.blocks:
-                block = Placable.BLOCK.get_shape()
-                block.batch = block_batch
-                block.x = block_pos[0]
-                block.y = block_pos[1]
+        for block_pos in points(loaded_level.blocks):
+            self.blocks[block_pos] = Placable.BLOCK
+            block_mesh.add(block_pos)
 
-                self.blocks[block_pos] = block
+        for enemy_pos in points(loaded_level.enemies):
+            enemy = Placable.ENEMY.get_shape()
+            enemy.batch = enemy_batch
+            enemy.x = enemy_pos[0]
+            enemy.y = enemy_pos[1]
 
-            for enemy_pos in loaded_level.enemies:
-                enemy = Placable.ENEMY.get_shape()
-                enemy.batch = enemy_batch
-                enemy.x = enemy_pos[0]
-                enemy.y = enemy_pos[1]
+            self.enemies[enemy_pos] = enemy
 
-                self.enemies[enemy_pos] = enemy
+        for ammo_pos in points(loaded_level.ammo):
+            ammo = Placable.AMMO.get_shape()
+            ammo.batch = ammo_batch
+            ammo.x = ammo_pos[0]
+            ammo.y = ammo_pos[1]
+
+            self.ammo[ammo_pos] = ammo
+
+        self.player_spawn = loaded_level.player_spawn
+        self.level_end = loaded_level.level_end
+        self.level_name = level_name
+
+
+def points(values) -> list[tuple[int, int]]:
+    """Level coordinates as tuples, whether loaded from JSON or binary"""
+    return [tuple(point) for point in to_coords(values).tolist()]
+
+
+def next_level_name() -> str:
+    numbers = [
+        int(match.group(1))
+        for match in map(LEVEL_NAME.fullmatch, os.listdir("levels"))
+        if match is not None
+    ]
+    return f"level_{max(numbers, default=0) + 1}.json"
+
+
+class LevelSaver:
+    """Saves level snapshots on a worker thread.
+
+    Presses within SAVE_DEBOUNCE seconds become one save, and a save asked
+    for while one is being written only keeps the newest snapshot, so the
+    editor never waits on the disk and saves never pile up. Every save
+    folds the edit journal into the level file, saves asked for with
+    `check` also run the reachability analysis.
+    """
+
+    def __init__(self, level: "LevelBuild", journal: LevelJournal) -> None:
+        self.level = level
+        self.journal = journal
+        self.lock = threading.Lock()
+        # Snapshot, the number of the journal it folds in and whether to
+        # check it
+        self.pending: tuple[Level, int, bool] = None
+        self.saving = False
+        self.scheduled = False
+        self.check = False
+        # Newest saved file to analyze, on a separate worker
+        self.check_path: str = None
+        self.checking = False
+        self.status = ""
+
+        path = os.path.join("levels", level.level_name)
+        self.level_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def request(self, check: bool = False) -> None:
+        self.check |= check
+        if not self.scheduled:
+            self.scheduled = True
+            clock.schedule_once(self.flush, SAVE_DEBOUNCE)
+
+    def compact_due(self) -> bool:
+        """Whether the journal has grown enough to fold it into the level"""
+        limit = max(COMPACT_MIN_BYTES, COMPACT_RATIO * self.level_size)
+        return self.journal.size >= limit
+
+    def flush(self, dt: float) -> None:
+        self.scheduled = False
+        snapshot = (self.level.snapshot(), self.journal.rotate(), self.check)
+        self.check = False
+        with self.lock:
+            self.pending = snapshot
+            if self.saving:
+                return
+            self.saving = True
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self) -> None:
+        try:
+            while True:
+                with self.lock:
+                    pending, self.pending = self.pending, None
+                    if pending is None:
+                        return
+                self.save(*pending)
+        finally:
+            # Also reached if a save raised, a snapshot queued meanwhile
+            # gets a new worker
+            with self.lock:
+                self.saving = self.pending is not None
+            if self.saving:
+                threading.Thread(target=self.run, daemon=True).start()
+
+    def save(self, snapshot: Level, journal_number: int, check: bool) -> None:
+        level_name = self.level.level_name
+        path = os.path.join("levels", level_name)
+        self.status = f"Saving {level_name}..."
+
+        try:
+            save_level_file(snapshot, path)
+            self.journal.discard(journal_number)
+            self.level_size = os.path.getsize(path)
+        except Exception as error:
+            # The journal set aside stays on disk and the next save folds it in
+            self.status = f"Saving {level_name} failed: {error!r}"
+            return
+
+        self.status = f"Saved {level_name} at {time.strftime('%H:%M:%S')}"
+        if check:
+            self.start_check(path)
+
+    def start_check(self, path: str) -> None:
+        """Analyzes a saved level on its own thread, so a slow analysis
+        never holds up the next save"""
+        with self.lock:
+            self.check_path = path
+            if self.checking:
+                return
+            self.checking = True
+        threading.Thread(target=self.run_checks, daemon=True).start()
 
-            for ammo_pos in loaded_level.ammo:
-                ammo = Placable.AMMO.get_shape()
-                ammo.batch = ammo_batch
-                ammo.x = ammo_pos[0]
-                ammo.y = ammo_pos[1]
+    def run_checks(self) -> None:
+        while True:
+            with self.lock:
+                path, self.check_path = self.check_path, None
+                if path is None:
+                    self.checking = False
+                    return
 
-                self.ammo[ammo_pos] = ammo
+            level_name = os.path.basename(path)
+            try:
+                report = analyze_file(path)
+            except Exception as error:
+                self.status = f"Checking {level_name} failed: {error!r}"
+                continue
 
-            self.player_spawn = loaded_level.player_spawn
-            self.level_end = loaded_level.level_end
+            result = "ok" if report.ok else f"{len(report.problems)} problem(s)"
+            self.status = f"Checked {level_name}: {result}"
 
 
 selected_item: Placable = Placable.BLOCK
@@ -171,12 +396,28 @@ label = text.Label(
     anchor_y="baseline",
 )
 
+status_label = text.Label(
+    "",
+    font_name="Cairo",
+    font_size=16,
+    anchor_x="left",
+    anchor_y="baseline",
+)
+
 mouse_grid_pos = [0, 0]
 
 
-# 1: individual
-# 2: rect
-mode = 1
+class Tool(Enum):
+    SINGLE = 1
+    RECT = 2
+    FLOOD = 3
+
+
+tool = Tool.SINGLE
+# Grid cell and button a rectangle drag started with
+rect_start: tuple[tuple[int, int], int] = None
+rect_preview = shapes.Rectangle(0, 0, GRID_GAP, GRID_GAP, color=BLUE)
+rect_preview.opacity = 96
 
 
 level = LevelBuild({}, {}, None, {}, None)
@@ -202,114 +443,226 @@ def on_mouse_motion(x, y, dx, dy):
     update_mouse_pos(x, y)
 
 
-def place_item(item: Placable):
-    """Places selected item"""
+def place_item(item: Placable, pos) -> bool:
+    """Places an item at pos, False if it was already there"""
     match item:
         case Placable.BLOCK:
-            if mouse_grid_pos in level.blocks:
-                return
+            if pos in level.blocks:
+                return False
 
-            block = Placable.BLOCK.get_shape()
-            block.batch = block_batch
-            block.x = mouse_grid_pos[0]
-            block.y = mouse_grid_pos[1]
-
-            level.blocks[mouse_grid_pos] = block
+            level.blocks[pos] = Placable.BLOCK
+            block_mesh.add(pos)
 
         case Placable.PLAYER_SPAWN:
-            if mouse_grid_pos == level.player_spawn:
-                return
+            if pos == level.player_spawn:
+                return False
 
-            level.player_spawn = mouse_grid_pos
+            level.player_spawn = pos
 
         case Placable.ENEMY:
-            if mouse_grid_pos in level.enemies:
-                return
+            if pos in level.enemies:
+                return False
 
             enemy = Placable.ENEMY.get_shape()
             enemy.batch = enemy_batch
-            enemy.x = mouse_grid_pos[0]
-            enemy.y = mouse_grid_pos[1]
+            enemy.x = pos[0]
+            enemy.y = pos[1]
 
-            level.enemies[mouse_grid_pos] = enemy
+            level.enemies[pos] = enemy
 
         case Placable.AMMO:
-            if mouse_grid_pos in level.ammo:
-                return
+            if pos in level.ammo:
+                return False
 
             ammo = Placable.AMMO.get_shape()
             ammo.batch = enemy_batch
-            ammo.x = mouse_grid_pos[0]
-            ammo.y = mouse_grid_pos[1]
+            ammo.x = pos[0]
+            ammo.y = pos[1]
 
-            level.ammo[mouse_grid_pos] = ammo
+            level.ammo[pos] = ammo
 
         case Placable.LEVEL_END:
-            if mouse_grid_pos == level.level_end:
-                return
+            if pos == level.level_end:
+                return False
 
-            level.level_end = mouse_grid_pos
+            level.level_end = pos
 
+    return True
 
-def remove_item(item: Placable):
-    """Removes selected item"""
+
+def remove_item(item: Placable, pos) -> bool:
+    """Removes an item from pos, False if it wasn't there"""
     match item:
         case Placable.BLOCK:
 
-            if mouse_grid_pos not in level.blocks:
-                return
+            if pos not in level.blocks:
+                return False
 
-            del level.blocks[mouse_grid_pos]
+            del level.blocks[pos]
+            block_mesh.remove(pos)
 
         case Placable.PLAYER_SPAWN:
-            if mouse_grid_pos != level.player_spawn:
-                return
+            if pos != level.player_spawn:
+                return False
 
             level.player_spawn = None
 
         case Placable.ENEMY:
-            if mouse_grid_pos not in level.enemies:
-                return
+            if pos not in level.enemies:
+                return False
 
-            del level.enemies[mouse_grid_pos]
+            del level.enemies[pos]
 
         case Placable.AMMO:
-            if mouse_grid_pos not in level.ammo:
-                return
+            if pos not in level.ammo:
+                return False
 
-            del level.ammo[mouse_grid_pos]
+            del level.ammo[pos]
 
         case Placable.LEVEL_END:
-            if mouse_grid_pos != level.level_end:
-                return
+            if pos != level.level_end:
+                return False
 
             level.level_end = None
 
+    return True
+
+
+def apply_cells(place: bool, item: Placable, cells) -> list[tuple[int, int]]:
+    """Places or removes an item on many cells, returns the cells that changed.
+    Blocks are changed with bulk dict and mesh updates, the rest one by one."""
+    if item is not Placable.BLOCK:
+        apply = place_item if place else remove_item
+        return [pos for pos in cells if apply(item, pos)]
+
+    if place:
+        changed = [pos for pos in cells if pos not in level.blocks]
+        level.blocks.update(dict.fromkeys(changed, Placable.BLOCK))
+    else:
+        changed = [pos for pos in cells if pos in level.blocks]
+        for pos in changed:
+            del level.blocks[pos]
+
+    block_mesh.update(changed, place)
+    return changed
+
+
+def edit(place: bool, item: Placable, cells) -> None:
+    """Applies an edit from the mouse and logs it as one journal entry"""
+    changed = apply_cells(place, item, cells)
+    if changed:
+        journal.append(JournalEntry(place, item.value, changed))
+        if saver.compact_due():
+            saver.request()
+
+
+def rect_cells(start, end) -> list[tuple[int, int]]:
+    x0, x1 = sorted((start[0], end[0]))
+    y0, y1 = sorted((start[1], end[1]))
+    return [
+        (x, y)
+        for x in range(x0, x1 + GRID_GAP, GRID_GAP)
+        for y in range(y0, y1 + GRID_GAP, GRID_GAP)
+    ]
+
+
+def flood_cells(start, placed: bool) -> list[tuple[int, int]]:
+    """Cells connected to start that match it in having a block or not.
+    Empty space is only filled inside the window."""
+    if (start in level.blocks) != placed:
+        return []
+
+    left = camera_pos[0] - camera_pos[0] % GRID_GAP
+    bottom = camera_pos[1] - camera_pos[1] % GRID_GAP
+    right = left + win.width
+    top = bottom + win.height
+
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for pos in (
+            (x + GRID_GAP, y),
+            (x - GRID_GAP, y),
+            (x, y + GRID_GAP),
+            (x, y - GRID_GAP),
+        ):
+            if pos in seen or (pos in level.blocks) != placed:
+                continue
+            if not placed and not (left <= pos[0] <= right and bottom <= pos[1] <= top):
+                continue
+            seen.add(pos)
+            queue.append(pos)
+    return list(seen)
+
+
+@win.event
+def on_key_press(symbol, modifiers):
+    global tool
+
+    match symbol:
+        case key.L:
+            saver.request(check=True)
+        case key.Q:
+            tool = Tool.SINGLE
+        case key.R:
+            tool = Tool.RECT
+        case key.F:
+            tool = Tool.FLOOD
+
 
 @win.event
 def on_mouse_press(x, y, button, modifiers):
-    update_mouse_pos(x, y)
+    global rect_start
 
-    if button == 1:
-        place_item(selected_item)
+    update_mouse_pos(x, y)
+    if button not in (mouse.LEFT, mouse.RIGHT):
+        return
+    place = button == mouse.LEFT
 
-    elif button == 4:
-        remove_item(selected_item)
+    # Only blocks are laid out in bulk, everything else is placed one at a
+    # time whatever the tool
+    if tool is Tool.SINGLE or selected_item is not Placable.BLOCK:
+        edit(place, selected_item, [mouse_grid_pos])
+    elif tool is Tool.RECT:
+        rect_start = (mouse_grid_pos, button)
+    elif tool is Tool.FLOOD:
+        edit(place, Placable.BLOCK, flood_cells(mouse_grid_pos, not place))
 
 
 @win.event
 def on_mouse_drag(x, y, dx, dy, buttons, modifiers):
     update_mouse_pos(x, y)
+    if tool is not Tool.SINGLE and selected_item is Placable.BLOCK:
+        return
 
     if buttons & mouse.LEFT:
-        place_item(selected_item)
+        edit(True, selected_item, [mouse_grid_pos])
     elif buttons & mouse.RIGHT:
-        remove_item(selected_item)
+        edit(False, selected_item, [mouse_grid_pos])
+
+
+@win.event
+def on_mouse_release(x, y, button, modifiers):
+    global rect_start
+
+    if rect_start is None or button != rect_start[1]:
+        return
+
+    update_mouse_pos(x, y)
+    start, _ = rect_start
+    rect_start = None
+    edit(button == mouse.LEFT, Placable.BLOCK, rect_cells(start, mouse_grid_pos))
 
 
 spawn_sprite = Placable.PLAYER_SPAWN.get_shape()
 level_end_sprite = Placable.LEVEL_END.get_shape()
 
+# Half transparent shape under the mouse, one per item
+preview_shapes = {item: item.get_shape() for item in Placable}
+for preview_shape in preview_shapes.values():
+    preview_shape.opacity = 128
+
 
 @win.event
 def on_draw():
@@ -320,23 +673,39 @@ def on_draw():
     bg.y = camera_pos[1]
     label.x = camera_pos[0]
     label.y = camera_pos[1] + win.height - 50
-    label.text = f"Selected: {selected_item.name}"
+    label.text = f"Selected: {selected_item.name} ({tool.name.lower()})"
+    status_label.x = camera_pos[0] + 10
+    status_label.y = camera_pos[1] + 10
+    if status_label.text != saver.status:
+        status_label.text = saver.status
 
     bg.draw()
+    grid.update(camera_pos[0], camera_pos[1], win.width, win.height)
     grid_batch.draw()
     origin.draw()
     label.draw()
+    status_label.draw()
+    block_mesh.refresh()
     block_batch.draw()
     enemy_batch.draw()
     ammo_batch.draw()
 
-    mouse_sprite = selected_item.get_shape()
-    mouse_sprite.x = mouse_grid_pos[0]
-    mouse_sprite.y = mouse_grid_pos[1]
-    mouse_sprite.opacity = 128
-
+    mouse_sprite = preview_shapes[selected_item]
+    mouse_sprite.position = mouse_grid_pos
     mouse_sprite.draw()
 
+    if rect_start is not None:
+        start, button = rect_start
+        rect_preview.color = BLUE if button == mouse.LEFT else RED
+        rect_preview.opacity = 96
+        rect_preview.position = (
+            min(start[0], mouse_grid_pos[0]),
+            min(start[1], mouse_grid_pos[1]),
+        )
+        rect_preview.width = abs(mouse_grid_pos[0] - start[0]) + GRID_GAP
+        rect_preview.height = abs(mouse_grid_pos[1] - start[1]) + GRID_GAP
+        rect_preview.draw()
+
     if level.player_spawn is not None:
         spawn_sprite.x = level.player_spawn[0]
         spawn_sprite.y = level.player_spawn[1]
@@ -361,10 +730,6 @@ def on_draw():
     if keys[key.S]:
         camera_pos[1] -= cam_speed
 
-    if keys[key.L]:
-        level.save()
-        time.sleep(2)
-
     if keys[key._1]:
         selected_item = Placable.BLOCK
     if keys[key._2]:
@@ -379,4 +744,21 @@ def on_draw():
     win.view = Mat4().translate((-(camera_pos[0]), -(camera_pos[1]), 0))
 
 
+level.level_name = sys.argv[1] if len(sys.argv) > 1 else next_level_name()
+level_path = os.path.join("levels", level.level_name)
+if os.path.exists(level_path):
+    level.load(level.level_name)
+
+# Edits the last session made after its final save
+recovered = read_journal(journal_path(level_path))
+for entry in recovered:
+    apply_cells(entry.place, Placable(entry.item), entry.cells)
+
+journal = LevelJournal(journal_path(level_path))
+saver = LevelSaver(level, journal)
+if recovered:
+    # Fold them in right away instead of replaying them on every start
+    saver.status = f"Recovered {len(recovered)} edit(s) from the journal"
+    saver.request()
+
 app.run()
@@ -1,8 +1,20 @@
+import argparse
 import os
-from pyglet import app, window
+import time
+from pyglet import app, clock, window
 from core.game_context import GameContext
+from core.level_file import level_files
+from core.profiler import PROFILER
+from core.replay import InputRecorder, Recording, ReplayInput
 from pyglet.window import key
 
+parser = argparse.ArgumentParser()
+parser.add_argument("--record", metavar="PATH", help="record the session inputs")
+parser.add_argument("--replay", metavar="PATH", help="play back a recorded session")
+args = parser.parse_args()
+if args.record is not None and args.replay is not None:
+    parser.error("--record and --replay cannot be used together")
+
 
 width = 1280
 height = 720
@@ -16,8 +28,22 @@ win.push_handlers(keys)
 
 # level_context = LevelContext.load_level("level_4.json", win)
 
-game_context = GameContext(win, os.listdir("./levels"))
+levels = level_files("levels")
+recorder = None
+
+if args.replay is not None:
+    recording = Recording.load(args.replay)
+    game_context = GameContext(win, recording.level_names)
+    game_context.input = ReplayInput(recording)
+else:
+    game_context = GameContext(win, levels)
+
+if args.record is not None:
+    recorder = InputRecorder()
+    game_context.input = recorder
+
 game_context.next_level()
+clock.schedule(game_context.update, keys)
 # game_context.game_state = GameState.GAME_OVER
 
 
@@ -29,7 +55,23 @@ game_context.next_level()
 @win.event
 def on_draw():
     win.clear()
-    game_context.draw(win, keys)
+    game_context.draw(win)
+    PROFILER.end_frame()
+
+
+@win.event
+def on_key_press(symbol, modifiers):
+    # F3 toggles the frame profiler, F4 exports what it has collected
+    if symbol == key.F3:
+        PROFILER.toggle()
+    elif symbol == key.F4 and PROFILER.enabled:
+        os.makedirs("profiles", exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        PROFILER.export_csv(os.path.join("profiles", f"frames-{stamp}.csv"))
+        PROFILER.export_chrome_trace(os.path.join("profiles", f"trace-{stamp}.json"))
 
 
 app.run()
+
+if recorder is not None:
+    recorder.save(args.record)
@@ -1,5 +1,5 @@
 from pyglet import shapes
-from pyglet.graphics import Batch
+from pyglet.graphics import Batch, Group
 
 from core.body import Body
 
@@ -17,7 +17,7 @@ class Block(Body):
         self.color = color
         self.rect = None
 
-    def add_to_batch(self, batch: Batch) -> None:
+    def add_to_batch(self, batch: Batch, group: Group = None) -> None:
         self.rect = shapes.Rectangle(
             x=self.pos[0],
             y=self.pos[1],
@@ -25,6 +25,7 @@ class Block(Body):
             height=self.hitbox[1],
             color=self.color,
             batch=batch,
+            group=group,
         )
 
     def __str__(self) -> str:
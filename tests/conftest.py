@@ -0,0 +1,5 @@
+import pyglet
+
+# Tests run without a display, so importing the entity modules must not
+# open pyglet's shadow window
+pyglet.options["shadow_window"] = False
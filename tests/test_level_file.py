@@ -0,0 +1,41 @@
+import pytest
+
+from core.level import Level
+from core.level_file import level_files, load_level_file, save_level_file
+
+
+def test_level_files_one_per_level(tmp_path):
+    names = [
+        "level_10.json",
+        "level_2.json",
+        "level_1.lvl",
+        "level_1.json",
+        "notes.txt",
+    ]
+    for name in names:
+        (tmp_path / name).write_text("")
+
+    assert level_files(str(tmp_path)) == [
+        "level_1.lvl",
+        "level_2.json",
+        "level_10.json",
+    ]
+
+
+@pytest.mark.parametrize("extension", [".json", ".lvl"])
+def test_round_trip(tmp_path, extension):
+    level = Level()
+    level.blocks = [(0, 0), (30, 0), (-60, 90)]
+    level.enemies = [(120, 30)]
+    level.ammo = [(60, 60), (-30, 150)]
+    level.player_spawn = (0, 30)
+    level.level_end = (300, 30)
+    path = str(tmp_path / f"level_1{extension}")
+
+    save_level_file(level, path)
+    loaded = load_level_file(path)
+
+    for name in ("blocks", "enemies", "ammo"):
+        assert [tuple(point) for point in getattr(loaded, name)] == getattr(level, name)
+    assert tuple(loaded.player_spawn) == level.player_spawn
+    assert tuple(loaded.level_end) == level.level_end
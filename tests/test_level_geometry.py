@@ -0,0 +1,26 @@
+import numpy as np
+
+from benchmarks.level_generator import generate_level
+from core.level_geometry import BLOCK_WIDTH, LevelGeometry
+
+
+def test_chunks_cover_cells():
+    level = generate_level(5000, "hills")
+    geometry = LevelGeometry(level.blocks)
+
+    cells = []
+    for key, rects in geometry.chunks.items():
+        x, y, width, height = rects.T
+        assert (np.floor_divide(x, geometry.chunk_size) == key[0]).all()
+        assert (np.floor_divide(y, geometry.chunk_size) == key[1]).all()
+        assert ((x + width - 1) // geometry.chunk_size == key[0]).all()
+        assert ((y + height - 1) // geometry.chunk_size == key[1]).all()
+        for rx, ry, rw, rh in rects.tolist():
+            cells += [
+                (cx, cy)
+                for cx in range(rx, rx + rw, BLOCK_WIDTH)
+                for cy in range(ry, ry + rh, BLOCK_WIDTH)
+            ]
+
+    assert len(cells) == len(set(cells))
+    assert set(cells) == {tuple(block) for block in level.blocks}
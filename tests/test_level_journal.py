@@ -0,0 +1,36 @@
+from core.level_journal import JournalEntry, LevelJournal, read_journal
+
+
+def test_append_after_torn_line(tmp_path):
+    path = tmp_path / "level_1.journal"
+    path.write_text("+1 30 60\n+1 90 ")
+
+    journal = LevelJournal(str(path))
+    journal.append(JournalEntry(True, 1, [(120, 150)]))
+    journal.close()
+
+    assert read_journal(str(path)) == [
+        JournalEntry(True, 1, [(30, 60)]),
+        JournalEntry(True, 1, [(120, 150)]),
+    ]
+
+
+def test_torn_first_line(tmp_path):
+    path = tmp_path / "level_1.journal"
+    path.write_text("-2 9")
+
+    journal = LevelJournal(str(path))
+    journal.append(JournalEntry(False, 2, [(0, 30)]))
+    journal.close()
+
+    assert read_journal(str(path)) == [JournalEntry(False, 2, [(0, 30)])]
+
+
+def test_no_file_without_edits(tmp_path):
+    path = tmp_path / "level_1.journal"
+    journal = LevelJournal(str(path))
+    number = journal.rotate()
+    journal.discard(number)
+    journal.close()
+
+    assert list(tmp_path.iterdir()) == []
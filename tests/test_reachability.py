@@ -0,0 +1,107 @@
+import tracemalloc
+
+import pytest
+from pyglet.window import key
+
+from benchmarks.level_generator import generate_level
+from core.level import Level
+from core.level_geometry import BLOCK_WIDTH
+from core.level_loader import level_data
+from core.reachability import LevelGrid, analyze_level
+from core.simulation import Simulation
+
+
+def floor_level(length: int = 40) -> Level:
+    """Flat floor with the spawn on the left end and the portal on the right"""
+    level = Level()
+    level.blocks = [(x * BLOCK_WIDTH, 0) for x in range(length)]
+    level.player_spawn = (0, BLOCK_WIDTH)
+    level.level_end = ((length - 3) * BLOCK_WIDTH, BLOCK_WIDTH)
+    return level
+
+
+def obstacle_level(gap: int = 0, wall: int = 0) -> Level:
+    """Floor with a gap of `gap` cells and then a wall `wall` cells high
+    between the spawn and the portal"""
+    level = floor_level(60 + gap)
+    level.blocks = [
+        block for block in level.blocks if not 20 <= block[0] // BLOCK_WIDTH < 20 + gap
+    ]
+    level.blocks += [
+        ((30 + gap) * BLOCK_WIDTH, y * BLOCK_WIDTH) for y in range(1, wall + 1)
+    ]
+    return level
+
+
+def game_reaches_portal(level: Level) -> bool:
+    """Whether running right and jumping from some tick on gets the player
+    to the portal in the game"""
+    for jump_tick in range(40, 100):
+        simulation = Simulation("obstacle", level_data("obstacle", level))
+        simulation.level_context.player.health = float("inf")
+        result = simulation.run(
+            lambda tick: [key.D, key.W] if tick >= jump_tick else [key.D], 400
+        )
+        if result.outcome == "portal":
+            return True
+    return False
+
+
+def test_flat_floor_is_reachable():
+    report = analyze_level(floor_level())
+    assert report.ok, report.problems
+    assert report.spawn_grounded
+    assert report.portal_reachable
+
+
+def test_portal_behind_wall():
+    level = floor_level()
+    level.blocks += [(20 * BLOCK_WIDTH, y * BLOCK_WIDTH) for y in range(1, 12)]
+    report = analyze_level(level)
+    assert report.spawn_grounded
+    assert report.portal_reachable is False
+
+
+def test_pickups_out_of_reach():
+    level = floor_level()
+    level.ammo = [(10 * BLOCK_WIDTH, 2 * BLOCK_WIDTH), (10 * BLOCK_WIDTH, 900)]
+    level.enemies = [(200 * BLOCK_WIDTH, 10 * BLOCK_WIDTH)]
+    level.blocks += [(200 * BLOCK_WIDTH + x, 9 * BLOCK_WIDTH) for x in (0, 30, 60)]
+    report = analyze_level(level)
+    assert report.unreachable_ammo == [[10 * BLOCK_WIDTH, 900]]
+    assert report.unreachable_enemies == [[200 * BLOCK_WIDTH, 10 * BLOCK_WIDTH]]
+
+
+def test_spawn_over_void():
+    level = floor_level()
+    level.player_spawn = (-40 * BLOCK_WIDTH, 10 * BLOCK_WIDTH)
+    report = analyze_level(level)
+    assert not report.spawn_grounded
+    assert not report.ok
+
+
+def test_large_level_size():
+    # Platforms drift downwards, so the bounding box of this level is about
+    # 27k by 1.4k cells. Only the rows around blocks may be stored.
+    level = generate_level(20000, "platforms")
+    grid = LevelGrid(level)
+    assert grid.solid_bands.size == len(level.blocks)
+    assert grid.lattice.size < 30 * len(level.blocks)
+
+    tracemalloc.start()
+    try:
+        report = analyze_level(level)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert report.ok, report.problems
+    assert peak < 100_000_000
+
+
+@pytest.mark.parametrize(
+    "gap, wall, reachable", [(13, 0, True), (14, 0, False), (0, 5, True), (0, 6, False)]
+)
+def test_limits_match_game(gap, wall, reachable):
+    level = obstacle_level(gap, wall)
+    assert game_reaches_portal(level) is reachable
+    assert analyze_level(level).portal_reachable is reachable